@@ -90,6 +90,25 @@ CREATE TABLE auditoria_master (
     nuevo VARCHAR2(800)
 );
 
+-- Índices de los filtros y órdenes de la API (?precio_min=, ?nombre_prefix=, ?cargo=, ?sort=...);
+-- la PK al final desempata el orden y permite paginar por rango sin ordenar la tabla
+CREATE INDEX idx_producto_precio ON producto (precio, id_producto);
+CREATE INDEX idx_producto_nombre ON producto (nombre, id_producto);
+CREATE INDEX idx_cliente_nombre ON cliente_chillogallo (nombre, id_cliente);
+CREATE INDEX idx_cliente_telefono ON cliente_chillogallo (telefono);
+CREATE INDEX idx_sucursal_nombre ON sucursal_qs (nombre, id_sucursal);
+CREATE INDEX idx_empleado_cargo ON empleado_sur (cargo, id_empleado);
+CREATE INDEX idx_empleado_nombre ON empleado_sur (nombre, id_empleado);
+CREATE INDEX idx_tarjeta_tipo ON tarjeta (tipo, id_tarjeta);
+CREATE INDEX idx_fabrica_pais ON fabrica (pais, id_fabrica);
+CREATE INDEX idx_fabrica_nombre ON fabrica (nombre, id_fabrica);
+
+-- Índices para paginar auditoría por (fecha, id_auditoria) sin ordenar la tabla completa
+CREATE INDEX idx_auditoria_fecha ON auditoria_master (fecha, id_auditoria);
+CREATE INDEX idx_auditoria_tabla_fecha ON auditoria_master (nombre_table, fecha, id_auditoria);
+-- Cambios de una tabla posteriores a una marca (/api/<recurso>/changes?since=)
+CREATE INDEX idx_auditoria_tabla_id ON auditoria_master (nombre_table, id_auditoria);
+
 -- Triggers de auditoría
 CREATE OR REPLACE TRIGGER trg_audit_sucursal_qs
 AFTER DELETE OR INSERT OR UPDATE ON sucursal_qs
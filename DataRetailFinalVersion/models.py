@@ -1,337 +1,241 @@
+from datetime import datetime
 from database import db
+from dataretail_comun.resources import Resource, fetch_many, fetch_page, parse_fields
+from dataretail_comun.exporter import ExportQuery
+from dataretail_comun.cache import create_cache
 
-class ProductModel:
-    """Modelo para gestionar productos en Oracle Database"""
-    
-    @staticmethod
-    def get_all():
-        """Obtiene todos los productos"""
-        query = "SELECT * FROM PRODUCTO ORDER BY id_producto"
-        return db.execute_query(query)
-    
-    @staticmethod
-    def get_by_id(product_id):
-        """Obtiene un producto por ID"""
-        query = "SELECT * FROM PRODUCTO WHERE id_producto = :id"
-        result = db.execute_query(query, {'id': product_id})
-        return result[0] if result else None
-    
-    @staticmethod
-    def create(nombre, precio):
-        """Crea un nuevo producto"""
-        query = """
-        INSERT INTO PRODUCTO (id_producto, nombre, precio) 
-        VALUES (producto_seq.NEXTVAL, :nombre, :precio)
-        """
-        params = {
-            'nombre': nombre,
-            'precio': precio
-        }
-        return db.execute_dml(query, params)
-    
-    @staticmethod
-    def update(product_id, nombre, precio):
-        """Actualiza un producto existente"""
-        query = """
-        UPDATE PRODUCTO 
-        SET nombre = :nombre, precio = :precio
-        WHERE id_producto = :id
-        """
-        params = {
-            'id': product_id,
-            'nombre': nombre,
-            'precio': precio
-        }
-        return db.execute_dml(query, params)
-    
-    @staticmethod
-    def delete(product_id):
-        """Elimina un producto"""
-        query = "DELETE FROM PRODUCTO WHERE id_producto = :id"
-        return db.execute_dml(query, {'id': product_id})
+# Caché de lecturas de las tablas replicadas (catálogos: muchas lecturas, pocas escrituras)
+CATALOG_CACHE = create_cache('catalogo')
 
-class ClienteChillogattoModel:
-    """Modelo para gestionar clientes de Chillogallo en Oracle Database"""
-    
-    @staticmethod
-    def get_all():
-        """Obtiene todos los clientes"""
-        query = "SELECT * FROM CLIENTE_CHILLOGALLO ORDER BY id_cliente"
-        return db.execute_query(query)
-    
-    @staticmethod
-    def get_by_id(cliente_id):
-        """Obtiene un cliente por ID"""
-        query = "SELECT * FROM CLIENTE_CHILLOGALLO WHERE id_cliente = :id"
-        result = db.execute_query(query, {'id': cliente_id})
-        return result[0] if result else None
-    
-    @staticmethod
-    def create(nombre, telefono):
-        """Crea un nuevo cliente"""
-        query = """
-        INSERT INTO CLIENTE_CHILLOGALLO (id_cliente, nombre, direccion, telefono) 
-        VALUES (cliente_seq.NEXTVAL, :nombre, 'Chillogallo', :telefono)
-        """
-        params = {
-            'nombre': nombre,
-            'telefono': telefono
-        }
-        return db.execute_dml(query, params)
-    
-    @staticmethod
-    def update(cliente_id, nombre, telefono):
-        """Actualiza un cliente existente"""
-        query = """
-        UPDATE CLIENTE_CHILLOGALLO 
-        SET nombre = :nombre, telefono = :telefono
-        WHERE id_cliente = :id
-        """
-        params = {
-            'id': cliente_id,
-            'nombre': nombre,
-            'telefono': telefono
-        }
-        return db.execute_dml(query, params)
-    
-    @staticmethod
-    def delete(cliente_id):
-        """Elimina un cliente"""
-        query = "DELETE FROM CLIENTE_CHILLOGALLO WHERE id_cliente = :id"
-        return db.execute_dml(query, {'id': cliente_id})
+# Tablas del nodo maestro: cada Resource genera sus sentencias, CRUD, páginas y rutas;
+# sus triggers registran cada cambio en auditoria_master (ver /changes)
+ProductModel = Resource(
+    'producto', 'PRODUCTO', 'id_producto', ('nombre', 'precio'),
+    endpoint='products', label='Producto', plural='productos',
+    sequence='producto_seq', audit='auditoria_master', cache=CATALOG_CACHE, types={'precio': float},
+    filters={'precio': ('min', 'max'), 'nombre': ('prefix',)}, sortable=('nombre', 'precio')
+)
 
-class SucursalQSModel:
-    """Modelo para gestionar sucursales de Quito-Sur"""
-    
-    @staticmethod
-    def get_all():
-        """Obtiene todas las sucursales"""
-        query = "SELECT * FROM SUCURSAL_QS ORDER BY id_sucursal"
-        return db.execute_query(query)
-    
-    @staticmethod
-    def get_by_id(sucursal_id):
-        """Obtiene una sucursal por ID"""
-        query = "SELECT * FROM SUCURSAL_QS WHERE id_sucursal = :id"
-        result = db.execute_query(query, {'id': sucursal_id})
-        return result[0] if result else None
-    
-    @staticmethod
-    def create(nombre, direccion=None):
-        """Crea una nueva sucursal"""
-        query = """
-        INSERT INTO SUCURSAL_QS (id_sucursal, nombre, ciudad, direccion) 
-        VALUES (sucursal_seq.NEXTVAL, :nombre, 'Quito-Sur', :direccion)
-        """
-        params = {
-            'nombre': nombre,
-            'direccion': direccion
-        }
-        return db.execute_dml(query, params)
-    
-    @staticmethod
-    def update(sucursal_id, nombre, direccion=None):
-        """Actualiza una sucursal existente"""
-        query = """
-        UPDATE SUCURSAL_QS 
-        SET nombre = :nombre, direccion = :direccion
-        WHERE id_sucursal = :id
-        """
-        params = {
-            'id': sucursal_id,
-            'nombre': nombre,
-            'direccion': direccion
-        }
-        return db.execute_dml(query, params)
-    
-    @staticmethod
-    def delete(sucursal_id):
-        """Elimina una sucursal"""
-        query = "DELETE FROM SUCURSAL_QS WHERE id_sucursal = :id"
-        return db.execute_dml(query, {'id': sucursal_id})
+ClienteChillogattoModel = Resource(
+    'cliente_chillogallo', 'CLIENTE_CHILLOGALLO', 'id_cliente', ('nombre', 'direccion', 'telefono'),
+    endpoint='customers', label='Cliente', plural='clientes',
+    fixed={'direccion': 'Chillogallo'}, sequence='cliente_seq', audit='auditoria_master',
+    filters={'nombre': ('prefix',), 'telefono': ('eq',)}, sortable=('nombre',)
+)
 
-class EmpleadoSurModel:
-    """Modelo para gestionar empleados del Sur"""
-    
-    @staticmethod
-    def get_all():
-        """Obtiene todos los empleados"""
-        query = "SELECT * FROM EMPLEADO_SUR ORDER BY id_empleado"
-        return db.execute_query(query)
-    
-    @staticmethod
-    def get_by_id(empleado_id):
-        """Obtiene un empleado por ID"""
-        query = "SELECT * FROM EMPLEADO_SUR WHERE id_empleado = :id"
-        result = db.execute_query(query, {'id': empleado_id})
-        return result[0] if result else None
-    
-    @staticmethod
-    def create(nombre, cargo):
-        """Crea un nuevo empleado"""
-        query = """
-        INSERT INTO EMPLEADO_SUR (id_empleado, nombre, sucursal, cargo) 
-        VALUES (empleado_seq.NEXTVAL, :nombre, 'Sur', :cargo)
-        """
-        params = {
-            'nombre': nombre,
-            'cargo': cargo
-        }
-        return db.execute_dml(query, params)
-    
-    @staticmethod
-    def update(empleado_id, nombre, cargo):
-        """Actualiza un empleado existente"""
-        query = """
-        UPDATE EMPLEADO_SUR 
-        SET nombre = :nombre, cargo = :cargo
-        WHERE id_empleado = :id
-        """
-        params = {
-            'id': empleado_id,
-            'nombre': nombre,
-            'cargo': cargo
-        }
-        return db.execute_dml(query, params)
-    
-    @staticmethod
-    def delete(empleado_id):
-        """Elimina un empleado"""
-        query = "DELETE FROM EMPLEADO_SUR WHERE id_empleado = :id"
-        return db.execute_dml(query, {'id': empleado_id})
+SucursalQSModel = Resource(
+    'sucursal_qs', 'SUCURSAL_QS', 'id_sucursal', ('nombre', 'ciudad', 'direccion'),
+    endpoint='sucursales', label='Sucursal', plural='sucursales', feminine=True,
+    fixed={'ciudad': 'Quito-Sur'}, optional={'direccion': None}, sequence='sucursal_seq', audit='auditoria_master',
+    filters={'nombre': ('prefix',)}, sortable=('nombre',)
+)
+
+EmpleadoSurModel = Resource(
+    'empleado_sur', 'EMPLEADO_SUR', 'id_empleado', ('nombre', 'sucursal', 'cargo'),
+    endpoint='empleados', label='Empleado', plural='empleados',
+    fixed={'sucursal': 'Sur'}, sequence='empleado_seq', audit='auditoria_master',
+    filters={'cargo': ('eq',), 'nombre': ('prefix',)}, sortable=('nombre', 'cargo')
+)
+
+TarjetaModel = Resource(
+    'tarjeta', 'TARJETA', 'id_tarjeta', ('tipo', 'numero'),
+    endpoint='tarjetas', label='Tarjeta', plural='tarjetas', feminine=True,
+    sequence='tarjeta_seq', audit='auditoria_master', cache=CATALOG_CACHE,
+    filters={'tipo': ('eq',)}, sortable=('tipo',)
+)
+
+FabricaModel = Resource(
+    'fabrica', 'FABRICA', 'id_fabrica', ('nombre', 'pais'),
+    endpoint='fabricas', label='Fábrica', plural='fábricas', feminine=True,
+    sequence='fabrica_seq', audit='auditoria_master', cache=CATALOG_CACHE,
+    filters={'pais': ('eq',), 'nombre': ('prefix',)}, sortable=('nombre', 'pais')
+)
+
+RESOURCES = (ProductModel, ClienteChillogattoModel, SucursalQSModel,
+             EmpleadoSurModel, TarjetaModel, FabricaModel)
+
+class AuditoriaModel:
+    """Modelo para consultar auditoría"""
+
+    COLUMNS = ('id_auditoria', 'user_name', 'fecha', 'tipo_operacion', 'nombre_table', 'anterior', 'nuevo')
+    # La clave de las páginas (fecha, id_auditoria) se incluye en toda proyección
+    KEY_COLUMNS = ('id_auditoria', 'fecha')
+
+    # Consultas fijas: {columns} se completa con la proyección pedida (?fields=).
+    # Las páginas van sobre (fecha, id_auditoria) descendente; el predicado
+    # fecha <= :fecha permite recorrer idx_auditoria_fecha / idx_auditoria_tabla_fecha por rango
+    QUERIES = {
+        'get_all': ("""
+            SELECT {columns}
+            FROM auditoria_master 
+            ORDER BY fecha DESC
+        """, None),
+        'get_by_id': ("""
+            SELECT {columns}
+            FROM auditoria_master
+            WHERE id_auditoria = :id
+        """, 1),
+        'get_many': ("""
+            SELECT {columns}
+            FROM auditoria_master
+            WHERE id_auditoria IN (SELECT COLUMN_VALUE FROM TABLE(:ids))
+        """, None),
+        'get_by_table': ("""
+            SELECT {columns}
+            FROM auditoria_master 
+            WHERE nombre_table = :table_name
+            ORDER BY fecha DESC
+        """, None),
+        'get_recent': ("""
+            SELECT * FROM (
+                SELECT {columns}
+                FROM auditoria_master 
+                ORDER BY fecha DESC
+            ) WHERE ROWNUM <= :limit
+        """, None),
+        'page_first': ("""
+            SELECT {columns}
+            FROM auditoria_master
+            ORDER BY fecha DESC, id_auditoria DESC
+            FETCH FIRST :limit ROWS ONLY
+        """, None),
+        'page_after': ("""
+            SELECT {columns}
+            FROM auditoria_master
+            WHERE fecha <= :fecha
+              AND (fecha < :fecha OR id_auditoria < :id)
+            ORDER BY fecha DESC, id_auditoria DESC
+            FETCH FIRST :limit ROWS ONLY
+        """, None),
+        'table_page_first': ("""
+            SELECT {columns}
+            FROM auditoria_master
+            WHERE nombre_table = :table_name
+            ORDER BY fecha DESC, id_auditoria DESC
+            FETCH FIRST :limit ROWS ONLY
+        """, None),
+        'table_page_after': ("""
+            SELECT {columns}
+            FROM auditoria_master
+            WHERE nombre_table = :table_name
+              AND fecha <= :fecha
+              AND (fecha < :fecha OR id_auditoria < :id)
+            ORDER BY fecha DESC, id_auditoria DESC
+            FETCH FIRST :limit ROWS ONLY
+        """, None),
+        # La auditoría solo crece: el último id_auditoria (y su fecha) es su versión
+        'version': ("""
+            SELECT v.version,
+                   (SELECT a.fecha FROM auditoria_master a WHERE a.id_auditoria = v.version) AS modificado
+            FROM (SELECT MAX(id_auditoria) AS version FROM auditoria_master) v
+        """, 1),
+    }
+    _statements = {}
 
-class TarjetaModel:
-    """Modelo para gestionar tarjetas"""
-    
-    @staticmethod
-    def get_all():
-        """Obtiene todas las tarjetas"""
-        query = "SELECT * FROM TARJETA ORDER BY id_tarjeta"
-        return db.execute_query(query)
-    
-    @staticmethod
-    def get_by_id(tarjeta_id):
-        """Obtiene una tarjeta por ID"""
-        query = "SELECT * FROM TARJETA WHERE id_tarjeta = :id"
-        result = db.execute_query(query, {'id': tarjeta_id})
-        return result[0] if result else None
-    
     @staticmethod
-    def create(tipo, numero):
-        """Crea una nueva tarjeta"""
-        query = """
-        INSERT INTO TARJETA (id_tarjeta, tipo, numero) 
-        VALUES (tarjeta_seq.NEXTVAL, :tipo, :numero)
-        """
-        params = {
-            'tipo': tipo,
-            'numero': numero
-        }
-        return db.execute_dml(query, params)
-    
+    def statement(kind, fields=None):
+        """Sentencia kind con la proyección fields (None = todas las columnas)"""
+        fields = tuple(fields) if fields else AuditoriaModel.COLUMNS
+        dynamic = fields != AuditoriaModel.COLUMNS
+        statement = AuditoriaModel._statements.get(kind)
+        if statement is None or dynamic:
+            sql, expected_rows = AuditoriaModel.QUERIES[kind]
+            name = f'auditoria_master.{kind}'
+            if dynamic:
+                name += f"[{','.join(fields)}]"
+            statement = db.statement(name, sql.format(columns=', '.join(fields)), expected_rows,
+                                     dynamic=dynamic)
+            if not dynamic:
+                AuditoriaModel._statements[kind] = statement
+        return statement
+
     @staticmethod
-    def update(tarjeta_id, tipo, numero):
-        """Actualiza una tarjeta existente"""
-        query = """
-        UPDATE TARJETA 
-        SET tipo = :tipo, numero = :numero
-        WHERE id_tarjeta = :id
-        """
-        params = {
-            'id': tarjeta_id,
-            'tipo': tipo,
-            'numero': numero
-        }
-        return db.execute_dml(query, params)
+    def parse_fields(value):
+        """Valida ?fields= contra las columnas de auditoría (ValueError si no existen)"""
+        return parse_fields(value, AuditoriaModel.COLUMNS, required=AuditoriaModel.KEY_COLUMNS,
+                            aliases={'id': 'id_auditoria'})
     
     @staticmethod
-    def delete(tarjeta_id):
-        """Elimina una tarjeta"""
-        query = "DELETE FROM TARJETA WHERE id_tarjeta = :id"
-        return db.execute_dml(query, {'id': tarjeta_id})
+    def version():
+        """Versión de la auditoría para los ETag: (último id_auditoria, su fecha) o None si no se pudo leer"""
+        result = db.execute_query(AuditoriaModel.statement('version'))
+        if not result:
+            return None
+        return int(result[0]['VERSION'] or 0), result[0]['MODIFICADO']
 
-class FabricaModel:
-    """Modelo para gestionar fábricas"""
-    
     @staticmethod
-    def get_all():
-        """Obtiene todas las fábricas"""
-        query = "SELECT * FROM FABRICA ORDER BY id_fabrica"
-        return db.execute_query(query)
+    def get_all(stream=False, fields=None):
+        """Obtiene todos los registros de auditoría (por lotes si stream=True)"""
+        statement = AuditoriaModel.statement('get_all', fields)
+        if stream:
+            return db.stream_query(statement)
+        return db.execute_query(statement)
     
     @staticmethod
-    def get_by_id(fabrica_id):
-        """Obtiene una fábrica por ID"""
-        query = "SELECT * FROM FABRICA WHERE id_fabrica = :id"
-        result = db.execute_query(query, {'id': fabrica_id})
+    def get_by_id(auditoria_id, fields=None):
+        """Obtiene un registro de auditoría por ID"""
+        result = db.execute_query(AuditoriaModel.statement('get_by_id', fields), {'id': auditoria_id})
         return result[0] if result else None
     
     @staticmethod
-    def create(nombre, pais):
-        """Crea una nueva fábrica"""
-        query = """
-        INSERT INTO FABRICA (id_fabrica, nombre, pais) 
-        VALUES (fabrica_seq.NEXTVAL, :nombre, :pais)
-        """
-        params = {
-            'nombre': nombre,
-            'pais': pais
-        }
-        return db.execute_dml(query, params)
-    
-    @staticmethod
-    def update(fabrica_id, nombre, pais):
-        """Actualiza una fábrica existente"""
-        query = """
-        UPDATE FABRICA 
-        SET nombre = :nombre, pais = :pais
-        WHERE id_fabrica = :id
-        """
-        params = {
-            'id': fabrica_id,
-            'nombre': nombre,
-            'pais': pais
-        }
-        return db.execute_dml(query, params)
-    
-    @staticmethod
-    def delete(fabrica_id):
-        """Elimina una fábrica"""
-        query = "DELETE FROM FABRICA WHERE id_fabrica = :id"
-        return db.execute_dml(query, {'id': fabrica_id})
+    def get_many(ids, fields=None):
+        """Obtiene varios registros de auditoría por ID en una sola consulta
 
-class AuditoriaModel:
-    """Modelo para consultar auditoría"""
-    
-    @staticmethod
-    def get_all():
-        """Obtiene todos los registros de auditoría"""
-        query = """
-        SELECT id_auditoria, user_name, fecha, tipo_operacion, nombre_table, anterior, nuevo
-        FROM auditoria_master 
-        ORDER BY fecha DESC
+        Retorna ({id: registro} en el orden de ids, lista de IDs que no existen).
         """
-        return db.execute_query(query)
+        return fetch_many(AuditoriaModel.statement('get_many', fields), ids, 'ID_AUDITORIA')
     
     @staticmethod
-    def get_by_table(table_name):
-        """Obtiene auditoría por tabla"""
-        query = """
-        SELECT id_auditoria, user_name, fecha, tipo_operacion, nombre_table, anterior, nuevo
-        FROM auditoria_master 
-        WHERE nombre_table = :table_name
-        ORDER BY fecha DESC
+    def get_page(limit, after=None, table_name=None, fields=None):
+        """Obtiene una página de auditoría, de la más reciente a la más antigua
+
+        after es la clave [fecha ISO, id_auditoria] del último registro de la
+        página anterior; table_name filtra opcionalmente por tabla.
         """
-        return db.execute_query(query, {'table_name': table_name})
-    
+        key = lambda row: [row['FECHA'], row['ID_AUDITORIA']]
+        params = {}
+        if table_name:
+            params['table_name'] = table_name
+        if after is None:
+            kind = 'table_page_first' if table_name else 'page_first'
+        else:
+            kind = 'table_page_after' if table_name else 'page_after'
+            try:
+                params['fecha'] = datetime.fromisoformat(after[0])
+                params['id'] = int(after[1])
+            except (IndexError, TypeError, ValueError):
+                raise ValueError("Cursor de auditoría inválido")
+        return fetch_page(AuditoriaModel.statement(kind, fields), params, limit, key)
+    
+    @staticmethod
+    def get_by_table(table_name, stream=False, fields=None):
+        """Obtiene auditoría por tabla (por lotes si stream=True)"""
+        statement = AuditoriaModel.statement('get_by_table', fields)
+        if stream:
+            return db.stream_query(statement, {'table_name': table_name})
+        return db.execute_query(statement, {'table_name': table_name})
+    
+    @staticmethod
+    def get_recent(limit=50, stream=False, fields=None):
+        """Obtiene los registros más recientes de auditoría (por lotes si stream=True)"""
+        statement = AuditoriaModel.statement('get_recent', fields)
+        if stream:
+            return db.stream_query(statement, {'limit': limit})
+        # Se conoce el máximo de filas: traerlas todas en el primer viaje
+        return db.execute_query(statement, {'limit': limit},
+                                arraysize=limit, prefetchrows=limit + 1)
+
     @staticmethod
-    def get_recent(limit=50):
-        """Obtiene los registros más recientes de auditoría"""
-        query = """
-        SELECT * FROM (
-            SELECT id_auditoria, user_name, fecha, tipo_operacion, nombre_table, anterior, nuevo
-            FROM auditoria_master 
-            ORDER BY fecha DESC
-        ) WHERE ROWNUM <= :limit
-        """
-        return db.execute_query(query, {'limit': limit})
+    def export_query(args):
+        """Exportación de auditoría (?table= y ?fields= como en /api/auditoria)"""
+        fields = AuditoriaModel.parse_fields(args.get('fields')) or AuditoriaModel.COLUMNS
+        table_name = args.get('table')
+        if table_name:
+            statement, params = AuditoriaModel.statement('get_by_table', fields), {'table_name': table_name}
+        else:
+            statement, params = AuditoriaModel.statement('get_all', fields), None
+        return ExportQuery(statement, params, [field.upper() for field in fields], ('ID_AUDITORIA',), {})
+
+# Sentencias fijas: se preparan una vez por sesión del pool
+for kind in AuditoriaModel.QUERIES:
+    AuditoriaModel.statement(kind)
@@ -0,0 +1,115 @@
+-- SCRIPT ESCLAVO - Quito-Norte: auditoría de las tablas locales
+-- ============================
+-- Registra cada alta, cambio y baja de CLIENTE_CARAPUNGO, SUCURSAL_QN y
+-- EMPLEADO_NORTE en AUDITORIA_ESCLAVO. nombre_table lleva el nombre del
+-- recurso en app.py (cliente_carapungo, sucursal_qn, empleado_norte): la
+-- API lee con ese valor la versión de cada tabla (ETag) y /changes.
+
+-- Tabla de auditoría (se conserva si ya existe)
+BEGIN
+  EXECUTE IMMEDIATE 'CREATE TABLE auditoria_esclavo (
+    id_auditoria NUMBER GENERATED BY DEFAULT ON NULL AS IDENTITY PRIMARY KEY,
+    user_name VARCHAR2(100),
+    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    tipo_operacion CHAR(1),
+    nombre_table VARCHAR2(50),
+    anterior VARCHAR2(800),
+    nuevo VARCHAR2(800)
+  )';
+EXCEPTION
+  WHEN OTHERS THEN
+    IF SQLCODE != -955 THEN RAISE; END IF;
+END;
+/
+
+-- Versión de una tabla y cambios posteriores a una marca (/api/<recurso>/changes?since=)
+BEGIN
+  EXECUTE IMMEDIATE 'CREATE INDEX idx_auditoria_tabla_id ON auditoria_esclavo (nombre_table, id_auditoria)';
+EXCEPTION
+  WHEN OTHERS THEN
+    IF SQLCODE NOT IN (-955, -1408) THEN RAISE; END IF;
+END;
+/
+
+-- Triggers de auditoría
+CREATE OR REPLACE TRIGGER trg_audit_cliente_carapungo
+AFTER DELETE OR INSERT OR UPDATE ON cliente_carapungo
+FOR EACH ROW
+DECLARE
+  v_op VARCHAR2(1);
+  v_tabla VARCHAR2(20) := 'cliente_carapungo';
+  v_anterior VARCHAR2(800);
+  v_nuevo VARCHAR2(800);
+BEGIN
+  IF INSERTING THEN v_op := 'I';
+  ELSIF UPDATING THEN v_op := 'U';
+  ELSIF DELETING THEN v_op := 'D'; END IF;
+
+  IF :OLD.id_cliente IS NOT NULL THEN
+    v_anterior := :OLD.id_cliente || '|' || :OLD.nombre || '|' || :OLD.direccion || '|' || :OLD.telefono;
+  END IF;
+
+  IF :NEW.id_cliente IS NOT NULL THEN
+    v_nuevo := :NEW.id_cliente || '|' || :NEW.nombre || '|' || :NEW.direccion || '|' || :NEW.telefono;
+  END IF;
+
+  INSERT INTO auditoria_esclavo(user_name, fecha, tipo_operacion, nombre_table, anterior, nuevo)
+  VALUES (USER, SYSDATE, v_op, v_tabla, v_anterior, v_nuevo);
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_audit_sucursal_qn
+AFTER DELETE OR INSERT OR UPDATE ON sucursal_qn
+FOR EACH ROW
+DECLARE
+  v_op VARCHAR2(1);
+  v_tabla VARCHAR2(20) := 'sucursal_qn';
+  v_anterior VARCHAR2(800);
+  v_nuevo VARCHAR2(800);
+BEGIN
+  IF INSERTING THEN v_op := 'I';
+  ELSIF UPDATING THEN v_op := 'U';
+  ELSIF DELETING THEN v_op := 'D'; END IF;
+
+  IF :OLD.id_sucursal IS NOT NULL THEN
+    v_anterior := :OLD.id_sucursal || '|' || :OLD.nombre || '|' || :OLD.ciudad || '|' || :OLD.direccion;
+  END IF;
+
+  IF :NEW.id_sucursal IS NOT NULL THEN
+    v_nuevo := :NEW.id_sucursal || '|' || :NEW.nombre || '|' || :NEW.ciudad || '|' || :NEW.direccion;
+  END IF;
+
+  INSERT INTO auditoria_esclavo(user_name, fecha, tipo_operacion, nombre_table, anterior, nuevo)
+  VALUES (USER, SYSDATE, v_op, v_tabla, v_anterior, v_nuevo);
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_audit_empleado_norte
+AFTER DELETE OR INSERT OR UPDATE ON empleado_norte
+FOR EACH ROW
+DECLARE
+  v_op VARCHAR2(1);
+  v_tabla VARCHAR2(20) := 'empleado_norte';
+  v_anterior VARCHAR2(800);
+  v_nuevo VARCHAR2(800);
+BEGIN
+  IF INSERTING THEN v_op := 'I';
+  ELSIF UPDATING THEN v_op := 'U';
+  ELSIF DELETING THEN v_op := 'D'; END IF;
+
+  IF :OLD.id_empleado IS NOT NULL THEN
+    v_anterior := :OLD.id_empleado || '|' || :OLD.nombre || '|' || :OLD.sucursal || '|' || :OLD.cargo;
+  END IF;
+
+  IF :NEW.id_empleado IS NOT NULL THEN
+    v_nuevo := :NEW.id_empleado || '|' || :NEW.nombre || '|' || :NEW.sucursal || '|' || :NEW.cargo;
+  END IF;
+
+  INSERT INTO auditoria_esclavo(user_name, fecha, tipo_operacion, nombre_table, anterior, nuevo)
+  VALUES (USER, SYSDATE, v_op, v_tabla, v_anterior, v_nuevo);
+END;
+/
+
+-- Verificar los triggers
+SELECT trigger_name, table_name, status FROM user_triggers
+WHERE trigger_name IN ('TRG_AUDIT_CLIENTE_CARAPUNGO', 'TRG_AUDIT_SUCURSAL_QN', 'TRG_AUDIT_EMPLEADO_NORTE');
@@ -0,0 +1,31 @@
+"""
+Configuración de Oracle del nodo esclavo
+
+OracleDatabase y el pool de sesiones están en el paquete común
+dataretail_comun (en la raíz del repositorio); aquí solo se cargan las
+variables de entorno del nodo y se fija su conexión.
+"""
+
+import os
+import sys
+from dotenv import load_dotenv
+
+# Cargar variables de entorno (antes de importar el paquete común, que las lee al cargarse)
+load_dotenv()
+
+# El paquete común está junto a las carpetas de los dos nodos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataretail_comun.database import OracleDatabase, DatabaseUnavailableError, NumberList, db
+
+# Configuración de Oracle
+ORACLE_CONFIG = {
+    'username': os.getenv('ORACLE_USERNAME', 'esclavo'),
+    'password': os.getenv('ORACLE_PASSWORD', 'esclavo'),
+    'host': os.getenv('ORACLE_HOST', 'DISMAL-HP'),
+    'port': os.getenv('ORACLE_PORT', '1521'),
+    'service_name': os.getenv('ORACLE_SERVICE_NAME', 'orcl')
+}
+
+# Pool de sesiones compartido por todas las rutas del nodo esclavo
+db.configure(**ORACLE_CONFIG)
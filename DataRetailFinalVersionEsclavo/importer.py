@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Importación de archivos CSV hacia las tablas del nodo esclavo
+
+Envoltorio de línea de comandos de dataretail_comun.importer.
+
+Uso:
+    python importer.py products productos.csv
+    python importer.py customers clientes.csv --mode upsert --rejects rechazos.csv
+"""
+
+import sys
+import database  # noqa: F401 (carga la configuración del nodo y el paquete común)
+from dataretail_comun.importer import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,10 @@
+"""
+Código común de los nodos maestro y esclavo de DataRetail
+
+Pool de sesiones Oracle (database), motor de recursos CRUD (resources),
+formatos de respuesta (responses, encoders), caché (cache), importación y
+exportación masiva (importer, exporter), lotes (batch) y estado de Oracle
+en la API (status). Cada nodo conserva
+solo su configuración de Oracle (database.py) y la declaración de sus
+tablas (models.py en el maestro, app.py en el esclavo).
+"""
@@ -0,0 +1,101 @@
+from flask import jsonify, request
+from .database import db
+
+# Máximo de operaciones por POST /api/batch
+BATCH_MAX_OPERATIONS = 1000
+
+class BatchAborted(Exception):
+    """Una operación del lote falló: se deshace toda la transacción"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def run_operation(resources, operation):
+    """Ejecuta una operación {"resource", "op", "id", "data"}; retorna su resultado
+
+    Lanza BatchAborted con el código HTTP que tendría la operación sola.
+    """
+    if not isinstance(operation, dict):
+        raise BatchAborted(400, 'Cada operación debe ser un objeto JSON')
+    resource = resources.get(operation.get('resource'))
+    if resource is None:
+        raise BatchAborted(404, f"Recurso no encontrado: {operation.get('resource')}")
+    op = operation.get('op')
+    if op not in ('create', 'update', 'delete'):
+        raise BatchAborted(400, f"Operación no válida: {op} (create, update o delete)")
+    if resource.read_only:
+        raise BatchAborted(403, f"Los {resource.plural} son de solo lectura en este nodo")
+    record_id = None
+    if op != 'create':
+        try:
+            record_id = int(operation.get('id'))
+        except (TypeError, ValueError):
+            raise BatchAborted(400, f"{op} requiere un id entero")
+    try:
+        values = resource.values_from(operation.get('data')) if op != 'delete' else None
+    except ValueError as e:
+        raise BatchAborted(400, str(e))
+
+    row = None
+    if op == 'create':
+        row = outcome = resource.create(**values)
+    elif op == 'update':
+        row = outcome = resource.update(record_id, **values)
+    else:
+        outcome = resource.delete(record_id)
+    if outcome is None:
+        raise BatchAborted(500, f"Error en {op} de {resource.label.lower()}")
+    if not outcome:
+        raise BatchAborted(404, f"{resource.label} {resource._adjective('no encontrad')}: {record_id}")
+    result = {'resource': resource.endpoint, 'op': op}
+    if row is not None:
+        # Alta y modificación: la fila guardada, con el ID asignado
+        result['id'] = row[resource.pk.upper()]
+        result['data'] = resource.apply_transforms(row)
+    else:
+        result['id'] = record_id
+        result['affected'] = outcome
+    return result
+
+def register_batch_route(app, resources):
+    """Registra POST /api/batch: varias altas, cambios y bajas en una sola transacción
+
+    El cuerpo es una lista ordenada (o {"operations": [...]}) de
+    {"resource": "products", "op": "create|update|delete", "id": 1, "data": {...}}.
+    Todas se ejecutan en la misma sesión con un solo commit; si una falla
+    se deshacen todas y se responde con el código de esa operación.
+    """
+    by_endpoint = {resource.endpoint: resource for resource in resources}
+
+    @app.route('/api/batch', methods=['POST'])
+    def batch_operations():
+        body = request.get_json(silent=True)
+        operations = body.get('operations') if isinstance(body, dict) else body
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'success': False, 'error': 'Se esperaba una lista de operaciones'}), 400
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            return jsonify({'success': False,
+                            'error': f'Se pueden enviar hasta {BATCH_MAX_OPERATIONS} operaciones por lote'}), 400
+        results = []
+        try:
+            with db.transaction():
+                for index, operation in enumerate(operations):
+                    try:
+                        results.append(run_operation(by_endpoint, operation))
+                    except BatchAborted as e:
+                        e.index = index
+                        raise
+        except BatchAborted as e:
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'failed': e.index,
+                'results': results,
+                'message': 'No se aplicó ninguna operación del lote'
+            }), e.status
+        except Exception as e:
+            print(f"ERROR ejecutando lote: {str(e)}")
+            return jsonify({'success': False, 'error': str(e),
+                            'message': 'No se aplicó ninguna operación del lote'}), 500
+        return jsonify({'success': True, 'results': results})
@@ -0,0 +1,366 @@
+import hashlib
+import mmap
+import os
+import pickle
+import re
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# Entradas máximas y segundos de vida de la caché de resultados (0 la desactiva)
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '256'))
+RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', '60'))
+# Segundos que se reutiliza la versión leída de cada tabla: es el máximo que tarda en verse
+# una escritura hecha fuera de este proceso (otro nodo, SQL directo u otro proceso sin
+# SHARED_CACHE_DIR); las escrituras de la API la invalidan al confirmarse
+RESULT_CACHE_VERSION_TTL = float(os.getenv('RESULT_CACHE_VERSION_TTL', '2'))
+
+# Carpeta de la caché compartida por los procesos del nodo (p. ej. /dev/shm/dataretail);
+# vacía = una caché en memoria por proceso
+SHARED_CACHE_DIR = os.getenv('SHARED_CACHE_DIR', '')
+SHARED_CACHE_MAX_BYTES = int(os.getenv('SHARED_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# Segundos entre recorridos de la carpeta para medir su tamaño (lo escrito por los demás procesos)
+SHARED_CACHE_SCAN_SECONDS = float(os.getenv('SHARED_CACHE_SCAN_SECONDS', '30'))
+
+# Encabezado de cada entrada compartida: vencimiento (epoch) y generación del espacio
+GENERATION_BYTES = 16
+ENTRY_HEADER = struct.Struct(f'<d{GENERATION_BYTES}s')
+NO_GENERATION = bytes(GENERATION_BYTES)
+_MISSING = object()
+
+class ResultCache:
+    """Caché en memoria de resultados de consultas, con LRU, TTL y contadores
+
+    Las entradas se agrupan por espacio (el nombre del recurso). Cuando una
+    escritura sobre ese recurso se confirma, invalidate(espacio) descarta
+    sus entradas y sube su generación: una lectura que empezó antes del
+    commit no vuelve a guardar el resultado viejo.
+
+    version_ttl es la vida de la versión de cada tabla (por defecto
+    RESULT_CACHE_VERSION_TTL, nunca más que ttl): cada cuánto se vuelve a
+    preguntar a Oracle si la tabla cambió por fuera de este proceso.
+    """
+
+    def __init__(self, name, max_entries=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, version_ttl=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version_ttl = default_version_ttl(ttl, version_ttl)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0,
+                       'invalidations': 0, 'stale_loads': 0}
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get_or_load(self, space, key, loader, copy=None, keep=bool, ttl=None):
+        """Retorna el resultado guardado de (space, key) o lo carga con loader()
+
+        copy(valor) se aplica a lo que se entrega (los llamadores pueden
+        modificar las filas); solo se guardan los resultados para los que
+        keep(valor) es verdadero (execute_query retorna [] también ante errores).
+        ttl reemplaza la vida por defecto de esta entrada.
+        """
+        if not self.enabled:
+            return loader()
+        entry_key = (space, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                expires, value = entry
+                if expires > now:
+                    self._entries.move_to_end(entry_key)
+                    self._stats['hits'] += 1
+                    return copy(value) if copy is not None else value
+                del self._entries[entry_key]
+                self._stats['expirations'] += 1
+            self._stats['misses'] += 1
+            generation = self._generations.get(space, 0)
+
+        value = loader()
+        if keep(value):
+            self._store(space, entry_key, value, generation, self.ttl if ttl is None else ttl)
+        return copy(value) if copy is not None else value
+
+    def _store(self, space, entry_key, value, generation, ttl):
+        with self._lock:
+            if self._generations.get(space, 0) != generation:
+                # Hubo una escritura mientras se leía: el valor puede ser viejo
+                self._stats['stale_loads'] += 1
+                return
+            self._entries[entry_key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, space=None):
+        """Descarta las entradas de un espacio (o todas con space=None)"""
+        with self._lock:
+            if space is None:
+                spaces = set(key[0] for key in self._entries) | set(self._generations)
+                self._entries.clear()
+            else:
+                spaces = (space,)
+                for entry_key in [key for key in self._entries if key[0] == space]:
+                    del self._entries[entry_key]
+            for name in spaces:
+                self._generations[name] = self._generations.get(name, 0) + 1
+            self._stats['invalidations'] += 1
+
+    def get_stats(self):
+        """Contadores de la caché (aciertos, fallos, desalojos, invalidaciones)"""
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'name': self.name,
+            'backend': 'proceso',
+            'enabled': self.enabled,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl,
+            'version_ttl_seconds': self.version_ttl,
+            'hit_ratio': round(stats['hits'] / lookups, 3) if lookups else None
+        })
+        return stats
+
+class SharedCache:
+    """Caché de resultados compartida por los procesos del nodo, en archivos mapeados en memoria
+
+    Misma interfaz que ResultCache. Cada entrada es un archivo de directory
+    (en Linux, bajo /dev/shm: memoria compartida) con su vencimiento, la
+    generación del espacio y el valor serializado. Se publica de forma
+    atómica: se escribe un temporal y se renombra con os.replace, así cada
+    lector ve completa la versión anterior o la nueva. Los lectores abren
+    la entrada con mmap y la deserializan sin copiar el archivo.
+
+    La invalidación es por versión: cada espacio tiene un archivo con su
+    generación (un valor único que se reemplaza en cada escritura
+    confirmada) y las entradas guardadas con otra generación dejan de
+    valer en todos los procesos a la vez; el proceso que la cambia borra
+    los archivos del espacio. El tamaño se estima con lo que escribe este
+    proceso y se mide recorriendo la carpeta cada scan_seconds o al pasar
+    max_bytes; entonces se borran los archivos usados hace más tiempo. La
+    carpeta se crea solo para el usuario del proceso (las entradas se leen
+    con pickle).
+    """
+
+    def __init__(self, name, directory, max_bytes=SHARED_CACHE_MAX_BYTES,
+                 ttl=RESULT_CACHE_TTL, version_ttl=None, scan_seconds=SHARED_CACHE_SCAN_SECONDS):
+        self.name = name
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.scan_seconds = scan_seconds
+        self.ttl = ttl
+        self.version_ttl = default_version_ttl(ttl, version_ttl)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._lock = threading.Lock()
+        # Contadores de este proceso; el tamaño se mide sobre la carpeta
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0,
+                       'invalidations': 0, 'stale_loads': 0, 'write_errors': 0}
+        # Bytes estimados de la carpeta y momento del último recorrido
+        self._bytes = sum(size for used, size, path in self._scan())
+        self._scanned_at = time.monotonic()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0 and self.ttl > 0
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self._stats[counter] += amount
+
+    def _space_file(self, space):
+        return re.sub(r'[^A-Za-z0-9_-]', '_', str(space))
+
+    def _entry_path(self, space, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{self._space_file(space)}-{digest}.entry")
+
+    def _is_space_entry(self, filename, space):
+        """Indica si filename es una entrada de space (el nombre es espacio-sha1.entry)"""
+        if space is None:
+            return False
+        prefix = f"{self._space_file(space)}-"
+        return (filename.startswith(prefix) and filename.endswith('.entry')
+                and len(filename) == len(prefix) + 40 + len('.entry'))
+
+    def _generation_path(self, space):
+        return os.path.join(self.directory, f"{self._space_file(space)}.gen")
+
+    def _generation(self, space):
+        try:
+            with open(self._generation_path(space), 'rb') as handle:
+                return handle.read(GENERATION_BYTES) or NO_GENERATION
+        except FileNotFoundError:
+            return NO_GENERATION
+
+    def _publish(self, path, *chunks):
+        """Escribe un archivo completo y lo reemplaza de forma atómica"""
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                for chunk in chunks:
+                    handle.write(chunk)
+            os.replace(temp, path)
+        except OSError:
+            try:
+                os.unlink(temp)
+            except OSError:
+                pass
+            raise
+
+    def _read(self, path, generation):
+        """Valor vigente de una entrada o _MISSING (no existe, venció o es de otra generación)"""
+        try:
+            with open(path, 'rb') as handle:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    expires, stored_generation = ENTRY_HEADER.unpack_from(data)
+                    if stored_generation != generation:
+                        return _MISSING
+                    now = time.time()
+                    if expires <= now:
+                        self._count('expirations')
+                        return _MISSING
+                    with memoryview(data) as view, view[ENTRY_HEADER.size:] as payload:
+                        value = pickle.loads(payload)
+                if now - os.fstat(handle.fileno()).st_mtime > 1:
+                    # Uso reciente para el desalojo (como máximo una vez por segundo)
+                    os.utime(path)
+                return value
+        except (OSError, ValueError, struct.error, pickle.UnpicklingError, EOFError):
+            return _MISSING
+
+    def get_or_load(self, space, key, loader, copy=None, keep=bool, ttl=None):
+        """Retorna el resultado guardado de (space, key) o lo carga con loader() (ver ResultCache)"""
+        if not self.enabled:
+            return loader()
+        path = self._entry_path(space, key)
+        generation = self._generation(space)
+        value = self._read(path, generation)
+        if value is not _MISSING:
+            self._count('hits')
+            return copy(value) if copy is not None else value
+        self._count('misses')
+        value = loader()
+        if keep(value):
+            self._store(space, path, value, generation, self.ttl if ttl is None else ttl)
+        return copy(value) if copy is not None else value
+
+    def _store(self, space, path, value, generation, ttl):
+        if self._generation(space) != generation:
+            # Hubo una escritura (en cualquier proceso) mientras se leía
+            self._count('stale_loads')
+            return
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            self._publish(path, ENTRY_HEADER.pack(time.time() + ttl, generation), payload)
+        except (OSError, pickle.PicklingError, TypeError) as e:
+            print(f"Error guardando en la caché compartida {self.name}: {e}")
+            self._count('write_errors')
+            return
+        with self._lock:
+            self._bytes += ENTRY_HEADER.size + len(payload)
+            due = (self._bytes > self.max_bytes
+                   or time.monotonic() - self._scanned_at >= self.scan_seconds)
+        if due:
+            self._evict()
+
+    def _scan(self):
+        """Entradas de la carpeta: [(última vez usada, tamaño, ruta)]"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.entry'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        """Mide la carpeta y borra las entradas usadas hace más tiempo hasta volver bajo max_bytes"""
+        entries = self._scan()
+        total = sum(size for used, size, path in entries)
+        evicted = 0
+        if total > self.max_bytes:
+            for used, size, path in sorted(entries):
+                try:
+                    os.unlink(path)
+                    evicted += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        with self._lock:
+            self._bytes = total
+            self._scanned_at = time.monotonic()
+            self._stats['evictions'] += evicted
+
+    def invalidate(self, space=None):
+        """Cambia la generación de un espacio (o de todos con space=None) y borra sus entradas"""
+        if space is None:
+            spaces = [name[:-len('.gen')] for name in os.listdir(self.directory) if name.endswith('.gen')]
+        else:
+            spaces = [space]
+        for name in spaces:
+            try:
+                self._publish(self._generation_path(name), os.urandom(GENERATION_BYTES))
+            except OSError as e:
+                print(f"Error invalidando la caché compartida {self.name}: {e}")
+        # Las entradas anteriores ya no valen en ningún proceso: se borran en lugar de
+        # esperar a que el tamaño obligue a desalojarlas
+        freed = 0
+        for entry in os.scandir(self.directory):
+            if (space is None and entry.name.endswith('.entry')) or self._is_space_entry(entry.name, space):
+                try:
+                    size = entry.stat().st_size
+                    os.unlink(entry.path)
+                    freed += size
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._bytes = max(0, self._bytes - freed)
+        self._count('invalidations')
+
+    def get_stats(self):
+        """Contadores de este proceso y tamaño actual de la caché compartida"""
+        with self._lock:
+            stats = dict(self._stats)
+        entries = self._scan()
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'name': self.name,
+            'backend': 'compartida',
+            'directory': self.directory,
+            'enabled': self.enabled,
+            'entries': len(entries),
+            'bytes': sum(size for used, size, path in entries),
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl,
+            'version_ttl_seconds': self.version_ttl,
+            'hit_ratio': round(stats['hits'] / lookups, 3) if lookups else None
+        })
+        return stats
+
+def default_version_ttl(ttl, version_ttl=None):
+    """Vida de la versión de las tablas: la pedida o RESULT_CACHE_VERSION_TTL, sin pasar de ttl"""
+    return min(ttl, version_ttl if version_ttl is not None else RESULT_CACHE_VERSION_TTL)
+
+def create_cache(name, ttl=RESULT_CACHE_TTL, version_ttl=None):
+    """Caché de resultados del nodo: compartida entre procesos si SHARED_CACHE_DIR está definida"""
+    if SHARED_CACHE_DIR:
+        try:
+            return SharedCache(name, os.path.join(SHARED_CACHE_DIR, name), ttl=ttl, version_ttl=version_ttl)
+        except OSError as e:
+            print(f"⚠️ No se pudo usar la caché compartida en {SHARED_CACHE_DIR} ({e}): caché por proceso")
+    return ResultCache(name, ttl=ttl, version_ttl=version_ttl)
@@ -0,0 +1,1332 @@
+import cx_Oracle
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from contextlib import contextmanager
+
+# Códigos ORA que indican que la sesión ya no es utilizable
+DEAD_SESSION_CODES = {28, 1012, 2396, 3113, 3114, 3135, 12537, 12547, 12570}
+# Errores de la capa cliente (ODPI-C) con el mismo significado
+DEAD_SESSION_PREFIXES = ('DPI-1010', 'DPI-1080')
+
+# Códigos ORA de red/espera que indican que Oracle no está respondiendo
+UNAVAILABLE_CODES = {12170, 12514, 12528, 12541, 12543, 24457}
+# DPI-1067: se agotó el call_timeout de la llamada
+TIMEOUT_PREFIXES = ('DPI-1067',)
+
+# Códigos ORA de conexión perdida con el servidor: solo estos justifican reconstruir el pool
+DEAD_CONNECTION_CODES = {3113, 3114, 3135, 12537, 12541, 12547, 12570}
+# ORA-24457: ninguna sesión del pool quedó libre dentro de wait_timeout (pool lleno, no caído)
+POOL_TIMEOUT_CODES = {24457}
+
+def is_dead_session_error(error):
+    """Indica si un error de Oracle implica que la sesión está muerta"""
+    detail = error.args[0] if error.args else error
+    if getattr(detail, 'code', None) in DEAD_SESSION_CODES:
+        return True
+    return str(detail).startswith(DEAD_SESSION_PREFIXES)
+
+def _error_code(error):
+    detail = error.args[0] if error.args else error
+    return getattr(detail, 'code', None)
+
+def is_dead_connection_error(error):
+    """Indica si un error de Oracle implica que se perdió la conexión con el servidor"""
+    return _error_code(error) in DEAD_CONNECTION_CODES
+
+def is_pool_timeout_error(error):
+    """Indica si un error es la espera agotada por una sesión libre del pool"""
+    return _error_code(error) in POOL_TIMEOUT_CODES
+
+def is_unavailable_error(error):
+    """Indica si un error de Oracle cuenta como caída (timeout, red o sesión muerta)"""
+    if is_dead_session_error(error):
+        return True
+    detail = error.args[0] if error.args else error
+    if getattr(detail, 'code', None) in UNAVAILABLE_CODES:
+        return True
+    return str(detail).startswith(TIMEOUT_PREFIXES)
+
+class DatabaseUnavailableError(Exception):
+    """Oracle no está disponible: circuito abierto o tiempo de espera agotado"""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Corta el acceso a Oracle tras fallos repetidos para fallar rápido
+
+    Estados: 'closed' (normal), 'open' (se rechaza todo hasta que pase
+    reset_timeout) y 'half_open' (se deja pasar una sola petición de prueba).
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._opens = 0
+        self._rejected = 0
+        self._last_failure = None
+
+    def _refresh(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+    def is_open(self):
+        """Indica si ahora mismo se rechazarían las peticiones"""
+        with self._lock:
+            self._refresh()
+            return self._state == self.OPEN
+
+    def is_closed(self):
+        """Indica si el circuito está cerrado (ni abierto ni esperando la prueba)"""
+        with self._lock:
+            self._refresh()
+            return self._state == self.CLOSED
+
+    def allow_request(self):
+        """Indica si una llamada puede ir a Oracle (en half_open solo la primera)"""
+        with self._lock:
+            self._refresh()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def retry_after(self):
+        """Segundos que faltan para volver a probar Oracle"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 1
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            return max(1, math.ceil(remaining))
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._failures += 1
+            if error is not None:
+                self._last_failure = str(error)
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._opens += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def get_state(self):
+        """Retorna el estado actual del circuito"""
+        with self._lock:
+            self._refresh()
+            retry_after = None
+            if self._state == self.OPEN:
+                retry_after = max(1, math.ceil(self.reset_timeout - (time.monotonic() - self._opened_at)))
+            return {
+                'state': self._state,
+                'failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'retry_after': retry_after,
+                'opens': self._opens,
+                'rejected': self._rejected,
+                'last_failure': self._last_failure
+            }
+
+class HealthSupervisor:
+    """Valida en segundo plano las sesiones inactivas del pool
+
+    Sustituye al ping() antes de cada sentencia: las sesiones muertas se
+    detectan aquí o por los errores de las consultas, y la reconexión se
+    hace en este hilo, fuera del camino de las peticiones.
+    """
+
+    def __init__(self, database, interval):
+        self.database = database
+        self.interval = interval
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.state = {
+            'status': 'unknown',
+            'last_check': None,
+            'last_ok': None,
+            'last_error': None,
+            'consecutive_failures': 0,
+            'checks': 0,
+            'dead_sessions': 0,
+            'reconnects': 0
+        }
+
+    def start(self):
+        """Arranca el hilo supervisor si aún no está en marcha"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='oracle-health', daemon=True)
+            self._thread.start()
+
+    def notify_failure(self, error):
+        """Registra una sesión muerta detectada en una consulta y despierta al supervisor"""
+        with self._lock:
+            self.state['status'] = 'degraded'
+            self.state['last_error'] = str(error)
+            self.state['dead_sessions'] += 1
+        self._wake.set()
+
+    def get_state(self):
+        """Retorna el último estado de salud conocido"""
+        with self._lock:
+            return dict(self.state)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.check()
+            except Exception as error:
+                print(f"Error en supervisor de salud Oracle: {error}")
+
+    def check(self):
+        """Hace ping a una sesión libre del pool; 'busy' si no hay ninguna libre"""
+        database = self.database
+        pool = database.pool
+        error = None
+        checked = 0
+        dead = 0
+        busy = False
+        degraded = False
+        lost = pool is None
+
+        if pool is not None:
+            connection = None
+            try:
+                busy = pool.opened >= database.pool_max and pool.busy >= pool.opened
+                if not busy:
+                    connection = pool.acquire()
+            except cx_Oracle.Error as acquire_error:
+                error = acquire_error
+                busy = is_pool_timeout_error(acquire_error)
+                lost = is_dead_connection_error(acquire_error)
+
+            if connection is not None:
+                checked = 1
+                alive = False
+                try:
+                    connection.call_timeout = database.read_timeout_ms
+                    connection.ping()
+                    alive = True
+                except cx_Oracle.Error as ping_error:
+                    error = ping_error
+                    dead = 1
+                    lost = is_dead_connection_error(ping_error)
+                    degraded = not lost and is_dead_session_error(ping_error)
+                finally:
+                    if alive:
+                        pool.release(connection)
+                    else:
+                        database._drop(pool, connection)
+
+        healthy = checked > dead
+        if lost:
+            # Reconectar aquí, no en la petición que descubrió el fallo
+            print("Supervisor: conexión con Oracle perdida, reconstruyendo pool de sesiones...")
+            if database.reconnect():
+                with self._lock:
+                    self.state['reconnects'] += 1
+                healthy = True
+
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.state['checks'] += 1
+            self.state['last_check'] = now
+            self.state['dead_sessions'] += dead
+            if healthy:
+                database.breaker.record_success()
+                self.state['status'] = 'up'
+                self.state['last_ok'] = now
+                self.state['consecutive_failures'] = 0
+            elif busy or degraded:
+                self.state['status'] = 'busy' if busy else 'degraded'
+            else:
+                self.state['status'] = 'down'
+                self.state['consecutive_failures'] += 1
+            if error is not None:
+                self.state['last_error'] = str(error)
+        return healthy or busy or degraded
+
+class Statement:
+    """Sentencia SQL fija, declarada una vez en el registro
+
+    expected_rows es la cardinalidad esperada (1 para búsquedas por clave,
+    None si depende del tamaño de la tabla) y sirve de punto de partida
+    para elegir arraysize/prefetchrows antes de tener filas observadas.
+    coalesce indica que un DML de una fila puede agruparse con otros
+    concurrentes (ver WriteCoalescer). returning lista (columna, tipo) de
+    un DML con RETURNING ... INTO :ret_<columna> (tipo 'int', 'float' o
+    'text'; ver execute_returning). dynamic marca las variantes armadas
+    por petición (proyección, filtros u orden pedidos por el cliente): no
+    se preparan al abrir sesiones y el registro guarda solo las más usadas.
+    """
+
+    def __init__(self, name, sql, expected_rows=None, coalesce=False, returning=None, dynamic=False):
+        self.name = name
+        self.sql = sql
+        self.expected_rows = expected_rows
+        self.coalesce = coalesce
+        self.returning = tuple(returning or ())
+        self.dynamic = dynamic
+
+    def __repr__(self):
+        return f"Statement({self.name!r})"
+
+class StatementRegistry:
+    """Registro de las sentencias de los modelos (las dinámicas en un LRU de max_dynamic)"""
+
+    def __init__(self, default_arraysize=100, max_arraysize=5000, max_dynamic=200):
+        self.default_arraysize = default_arraysize
+        self.max_arraysize = max_arraysize
+        self.max_dynamic = max(1, max_dynamic)
+        self._lock = threading.Lock()
+        self._statements = {}
+        self._dynamic = OrderedDict()
+        self._stats = {}
+        self._warmed_sessions = 0
+        self._evicted = 0
+
+    def register(self, name, sql, expected_rows=None, coalesce=False, returning=None, dynamic=False):
+        """Declara una sentencia y retorna su Statement"""
+        sql = ' '.join(sql.split())
+        registry = self._dynamic if dynamic else self._statements
+        with self._lock:
+            existing = registry.get(name)
+            if existing is not None:
+                if existing.sql != sql:
+                    raise ValueError(f"Sentencia '{name}' registrada con otro SQL")
+                if dynamic:
+                    registry.move_to_end(name)
+                return existing
+            statement = Statement(name, sql, expected_rows, coalesce, returning, dynamic)
+            registry[name] = statement
+            self._stats[name] = {
+                'executions': 0, 'cursor_reuses': 0, 'dynamic': dynamic,
+                'expected_rows': expected_rows, 'avg_rows': None, 'max_rows': 0,
+                'arraysize': None, 'prefetchrows': None, 'round_trips': 0
+            }
+            if dynamic and len(registry) > self.max_dynamic:
+                evicted, _ = registry.popitem(last=False)
+                self._stats.pop(evicted, None)
+                self._evicted += 1
+            return statement
+
+    def __len__(self):
+        return len(self._statements)
+
+    def all(self):
+        """Sentencias estáticas (las que se parsean al abrir cada sesión)"""
+        with self._lock:
+            return list(self._statements.values())
+
+    def record(self, statement, reused):
+        """Cuenta una ejecución de la sentencia (reused: cursor ya abierto en la petición)"""
+        with self._lock:
+            stats = self._stats.get(statement.name)
+            if stats is None:
+                return
+            stats['executions'] += 1
+            if reused:
+                stats['cursor_reuses'] += 1
+
+    def fetch_sizes(self, statement):
+        """Elige (arraysize, prefetchrows) para la próxima ejecución
+
+        Con una fila esperada basta con prefetchrows=2: la fila y el fin de
+        datos llegan en el mismo viaje que el execute. Para listas se usa la
+        media observada de filas (o el valor por defecto mientras no haya
+        historial) redondeada a potencia de dos y acotada por max_arraysize.
+        """
+        with self._lock:
+            avg_rows = self._stats[statement.name]['avg_rows'] if statement.name in self._stats else None
+        expected = avg_rows if avg_rows is not None else statement.expected_rows
+        if expected is not None and expected <= 1:
+            return 2, 2
+        if expected is None:
+            arraysize = self.default_arraysize
+        else:
+            arraysize = 1 << max(int(expected), 1).bit_length()
+            arraysize = min(max(arraysize, 2), self.max_arraysize)
+        prefetchrows = arraysize if expected is None else min(arraysize, int(expected) + 1)
+        return arraysize, prefetchrows
+
+    def observe_rows(self, statement, rows, arraysize, prefetchrows):
+        """Registra las filas leídas y los tamaños de lote usados"""
+        if rows < prefetchrows:
+            round_trips = 1
+        else:
+            round_trips = 1 + math.ceil((rows - prefetchrows + 1) / arraysize)
+        with self._lock:
+            stats = self._stats.get(statement.name)
+            if stats is None:
+                return
+            # Media móvil exponencial: se adapta si la tabla crece o se reduce
+            if stats['avg_rows'] is None:
+                stats['avg_rows'] = float(rows)
+            else:
+                stats['avg_rows'] = round(0.8 * stats['avg_rows'] + 0.2 * rows, 2)
+            stats['max_rows'] = max(stats['max_rows'], rows)
+            stats['arraysize'] = arraysize
+            stats['prefetchrows'] = prefetchrows
+            stats['round_trips'] += round_trips
+
+    def record_warmup(self):
+        """Anota una sesión nueva con las sentencias estáticas ya parseadas"""
+        with self._lock:
+            self._warmed_sessions += 1
+
+    def get_stats(self):
+        """Retorna los contadores de ejecución y tamaños de lote por sentencia"""
+        with self._lock:
+            by_statement = {name: dict(stats) for name, stats in self._stats.items()}
+            warmed_sessions = self._warmed_sessions
+            dynamic = len(self._dynamic)
+            evicted = self._evicted
+        return {
+            'registered': len(by_statement),
+            'dynamic': dynamic,
+            'max_dynamic': self.max_dynamic,
+            'dynamic_evicted': evicted,
+            'warmed_sessions': warmed_sessions,
+            'executions': sum(stats['executions'] for stats in by_statement.values()),
+            'cursor_reuses': sum(stats['cursor_reuses'] for stats in by_statement.values()),
+            'default_arraysize': self.default_arraysize,
+            'max_arraysize': self.max_arraysize,
+            'by_statement': by_statement
+        }
+
+class _WriteGroup:
+    """Filas pendientes de una misma sentencia dentro de la ventana de agrupación"""
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.params = []
+        self.waits = []
+        self.results = None
+        self.error = None
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+class WriteCoalescer:
+    """Agrupa en un executemany con un solo commit los DML de una fila que llegan en window_ms"""
+
+    def __init__(self, database, window_ms, max_batch):
+        self.database = database
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._stats = {'batches': 0, 'rows': 0, 'max_batch': 0, 'errors': 0,
+                       'wait_ms_total': 0.0, 'flush_ms_total': 0.0}
+
+    @property
+    def enabled(self):
+        return self.window > 0
+
+    def submit(self, statement, params):
+        """Encola una fila y espera el resultado del grupo; retorna las filas afectadas"""
+        started = time.monotonic()
+        with self._lock:
+            group = self._pending.get(statement.name)
+            leader = group is None
+            if leader:
+                group = _WriteGroup(statement)
+                self._pending[statement.name] = group
+            index = len(group.params)
+            group.params.append(params)
+            if len(group.params) >= self.max_batch:
+                # Grupo lleno: las siguientes filas abren uno nuevo
+                self._pending.pop(statement.name, None)
+                group.full.set()
+
+        if leader:
+            group.full.wait(self.window)
+            with self._lock:
+                if self._pending.get(statement.name) is group:
+                    self._pending.pop(statement.name)
+            self._flush(group)
+        else:
+            group.done.wait()
+
+        with self._lock:
+            self._stats['wait_ms_total'] += (time.monotonic() - started) * 1000
+        if group.error is not None:
+            if isinstance(group.error, DatabaseUnavailableError):
+                # El 503 se informa en la petición de cada hilo
+                raise self.database._unavailable(str(group.error)) from group.error
+            raise group.error
+        return group.results[index]
+
+    def _flush(self, group):
+        started = time.monotonic()
+        try:
+            group.results = self.database.execute_group(group.statement, group.params)
+        except Exception as error:
+            group.error = error
+        finally:
+            group.done.set()
+        elapsed = (time.monotonic() - started) * 1000
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['rows'] += len(group.params)
+            self._stats['max_batch'] = max(self._stats['max_batch'], len(group.params))
+            self._stats['flush_ms_total'] += elapsed
+            if group.error is not None or group.results is None or None in group.results:
+                self._stats['errors'] += 1
+
+    def get_stats(self):
+        """Ventana, tamaño de los grupos y latencias (espera por fila y ejecución por grupo)"""
+        with self._lock:
+            stats = dict(self._stats)
+        batches, rows = stats['batches'], stats['rows']
+        return {
+            'enabled': self.enabled,
+            'window_ms': self.window * 1000,
+            'max_batch_size': self.max_batch,
+            'batches': batches,
+            'rows': rows,
+            'avg_batch': round(rows / batches, 2) if batches else None,
+            'largest_batch': stats['max_batch'],
+            'batches_with_errors': stats['errors'],
+            'avg_wait_ms': round(stats['wait_ms_total'] / rows, 3) if rows else None,
+            'avg_flush_ms': round(stats['flush_ms_total'] / batches, 3) if batches else None
+        }
+
+def _iso_datetime(value):
+    return value.isoformat() if value is not None else None
+
+def native_output_handler(cursor, name, default_type, size, precision, scale):
+    """Convierte NUMBER/DATE en el fetch para el formato por columnas
+
+    NUMBER entero declarado llega como int nativo y NUMBER con decimales
+    como double nativo (sin pasar por texto ni Decimal); el NUMBER sin
+    precisión queda con la conversión de cx_Oracle (int o float según el
+    valor). DATE/TIMESTAMP llegan ya en ISO 8601, listos para JSON.
+    """
+    if default_type == cx_Oracle.DB_TYPE_NUMBER:
+        if scale == 0 and 0 < precision <= 18:
+            return cursor.var(int, arraysize=cursor.arraysize)
+        if scale > 0:
+            return cursor.var(cx_Oracle.DB_TYPE_BINARY_DOUBLE, arraysize=cursor.arraysize)
+    elif default_type in (cx_Oracle.DB_TYPE_DATE, cx_Oracle.DB_TYPE_TIMESTAMP):
+        return cursor.var(default_type, arraysize=cursor.arraysize, outconverter=_iso_datetime)
+    return None
+
+def column_kinds(description):
+    """Tipo de cada columna tal como la entrega native_output_handler
+
+    'int', 'float', 'number' (NUMBER sin precisión: int o float según el
+    valor), 'date' (texto ISO 8601) o 'text'; sirve para armar esquemas
+    (p. ej. Arrow) sin inspeccionar los valores.
+    """
+    kinds = []
+    for column in description:
+        type_code, precision, scale = column[1], column[4], column[5]
+        if type_code == cx_Oracle.DB_TYPE_NUMBER:
+            if scale == 0 and precision and 0 < precision <= 18:
+                kinds.append('int')
+            elif scale and scale > 0:
+                kinds.append('float')
+            else:
+                kinds.append('number')
+        elif type_code in (cx_Oracle.DB_TYPE_DATE, cx_Oracle.DB_TYPE_TIMESTAMP):
+            kinds.append('date')
+        else:
+            kinds.append('text')
+    return tuple(kinds)
+
+class ColumnarResult:
+    """Resultado por columnas: los nombres una sola vez y cada fila como tupla
+
+    Evita construir un diccionario por fila; to_dict() queda listo para
+    jsonify ({"columns": [...], "rows": [[...], ...]}). kinds es el tipo de
+    cada columna (ver column_kinds) cuando se conoce.
+    """
+    __slots__ = ('columns', 'rows', 'kinds')
+
+    def __init__(self, columns, rows, kinds=None):
+        self.columns = columns
+        self.rows = rows
+        self.kinds = kinds
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def column(self, name):
+        """Retorna los valores de una columna"""
+        index = self.columns.index(name)
+        return [row[index] for row in self.rows]
+
+    def map_column(self, name, function):
+        """Retorna un resultado nuevo con function aplicada a una columna (si existe)"""
+        if name not in self.columns:
+            return self
+        index = self.columns.index(name)
+        rows = [row[:index] + (function(row[index]),) + row[index + 1:] for row in self.rows]
+        return ColumnarResult(self.columns, rows, self.kinds)
+
+    def as_dicts(self):
+        """Convierte a la lista de diccionarios de execute_query"""
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
+
+    def to_dict(self):
+        return {'columns': self.columns, 'rows': self.rows}
+
+# Tipo Python de las variables de salida de RETURNING ... INTO
+RETURNING_TYPES = {'int': int, 'float': float, 'text': str}
+RETURNING_TEXT_SIZE = 4000
+
+def returning_vars(cursor, statement, arraysize=1):
+    """Crea las variables :ret_<columna> de una sentencia con RETURNING"""
+    variables = {}
+    for column, kind in statement.returning:
+        if kind == 'text':
+            variable = cursor.var(str, RETURNING_TEXT_SIZE, arraysize=arraysize)
+        else:
+            variable = cursor.var(RETURNING_TYPES[kind], arraysize=arraysize)
+        variables[f'ret_{column}'] = variable
+    return variables
+
+def returned_row(statement, variables, position=0):
+    """Fila devuelta por RETURNING en la posición dada ({} si no se escribió ninguna)"""
+    row = {}
+    for column, kind in statement.returning:
+        values = variables[f'ret_{column}'].getvalue(position)
+        if not values:
+            return {}
+        row[column.upper()] = values[0]
+    return row
+
+# Módulo (v$session.module) de las sesiones del pool, para leer sus estadísticas
+SESSION_MODULE = 'dataretail'
+PARSE_STATS_SQL = """
+    SELECT n.name, SUM(st.value) AS value
+    FROM v$sesstat st
+    JOIN v$statname n ON n.statistic# = st.statistic#
+    JOIN v$session se ON se.sid = st.sid
+    WHERE se.module = :module
+      AND n.name IN ('execute count', 'parse count (total)', 'parse count (hard)', 'session cursor cache hits')
+    GROUP BY n.name
+"""
+
+# Colección de Oracle con la que se ligan las NumberList (TABLE(:ids))
+NUMBER_LIST_TYPE = 'SYS.ODCINUMBERLIST'
+
+class NumberList(tuple):
+    """Lista de números que se liga como un solo parámetro de colección
+
+    Permite consultas como WHERE id IN (SELECT COLUMN_VALUE FROM TABLE(:ids))
+    con una sola sentencia preparada sin importar cuántos IDs se pidan.
+    """
+
+class PooledConnection(cx_Oracle.Connection):
+    """Conexión del pool que guarda un cursor preparado por sentencia registrada
+
+    Los cursores viven lo que dura una petición (el objeto conexión no
+    sobrevive a release()); entre peticiones el reuso lo da la caché de
+    sentencias de la sesión, a la que vuelve cada sentencia al cerrar su
+    cursor.
+    """
+
+    def prepared_cursor(self, statement, columnar=False):
+        """Retorna (cursor, reutilizado) para una sentencia registrada
+
+        Las lecturas por columnas usan su propio cursor: las variables de
+        fetch se definen una vez por cursor y no se mezclan los formatos.
+        """
+        cursors = self.__dict__.setdefault('_prepared_cursors', {})
+        key = (statement.name, columnar)
+        cursor = cursors.get(key)
+        if cursor is not None:
+            return cursor, True
+        cursor = self.cursor()
+        if columnar:
+            cursor.outputtypehandler = native_output_handler
+        cursor.prepare(statement.sql)
+        cursors[key] = cursor
+        return cursor, False
+
+    def number_list(self, values):
+        """Crea la colección de Oracle para una NumberList (el tipo se busca una vez por sesión)"""
+        collection_type = self.__dict__.get('_number_list_type')
+        if collection_type is None:
+            collection_type = self.gettype(NUMBER_LIST_TYPE)
+            self.__dict__['_number_list_type'] = collection_type
+        return collection_type.newobject(list(values))
+
+    def close_prepared_cursors(self):
+        """Cierra los cursores antes de devolver la sesión: sus sentencias quedan en la caché de la sesión"""
+        cursors = self.__dict__.pop('_prepared_cursors', {})
+        for cursor in cursors.values():
+            try:
+                cursor.close()
+            except cx_Oracle.Error:
+                pass
+
+class OracleDatabase:
+    def __init__(self, host=None, port=None, service_name=None, username=None, password=None):
+        self.configure(host, port, service_name, username, password)
+
+        # Configuración del pool de sesiones
+        self.pool_min = int(os.getenv('ORACLE_POOL_MIN', '2'))
+        self.pool_max = int(os.getenv('ORACLE_POOL_MAX', '10'))
+        self.pool_increment = int(os.getenv('ORACLE_POOL_INCREMENT', '1'))
+        self.pool = None
+
+        # Tiempo máximo de espera por llamada (ms), distinto para lecturas y DML
+        self.read_timeout_ms = int(os.getenv('ORACLE_READ_TIMEOUT_MS', '5000'))
+        self.dml_timeout_ms = int(os.getenv('ORACLE_DML_TIMEOUT_MS', '10000'))
+        # Tiempo máximo esperando una sesión libre del pool (ms)
+        self.pool_wait_timeout_ms = int(os.getenv('ORACLE_POOL_WAIT_TIMEOUT_MS', '5000'))
+
+        # Circuito que corta el acceso tras fallos repetidos
+        self.breaker = CircuitBreaker(
+            int(os.getenv('ORACLE_BREAKER_THRESHOLD', '5')),
+            float(os.getenv('ORACLE_BREAKER_RESET_SECONDS', '30'))
+        )
+
+        # Registro de sentencias fijas y tamaño de la caché de sentencias por sesión
+        self.statements = StatementRegistry(
+            default_arraysize=int(os.getenv('ORACLE_FETCH_ARRAYSIZE', '100')),
+            max_arraysize=int(os.getenv('ORACLE_FETCH_MAX_ARRAYSIZE', '5000')),
+            max_dynamic=int(os.getenv('ORACLE_DYNAMIC_STATEMENTS', '200'))
+        )
+        self.stmt_cache_size = int(os.getenv('ORACLE_STMT_CACHE_SIZE', '50'))
+
+        # Supervisor de salud en segundo plano (segundos entre validaciones)
+        self.supervisor = HealthSupervisor(self, float(os.getenv('ORACLE_HEALTH_INTERVAL', '30')))
+
+        # Commit grupal de escrituras concurrentes (0 = desactivado)
+        self.coalescer = WriteCoalescer(
+            self,
+            float(os.getenv('ORACLE_WRITE_COALESCE_MS', '0')),
+            int(os.getenv('ORACLE_WRITE_COALESCE_MAX', '100'))
+        )
+
+        # Sesión tomada por cada hilo (permite anidar acquire() sin pedir otra)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._acquired = 0
+        self._released = 0
+        self._dropped = 0
+
+    def configure(self, host=None, port=None, service_name=None, username=None, password=None):
+        """Fija los datos de conexión del nodo (los omitidos salen de ORACLE_*)
+
+        Cada nodo llama a configure() sobre la instancia global db antes de
+        conectar; el pool se crea con estos datos en connect().
+        """
+        self.host = host or os.getenv('ORACLE_HOST')
+        self.port = port or os.getenv('ORACLE_PORT')
+        self.service_name = service_name or os.getenv('ORACLE_SERVICE_NAME')
+        self.username = username or os.getenv('ORACLE_USERNAME')
+        self.password = password or os.getenv('ORACLE_PASSWORD')
+
+    def _create_pool(self):
+        """Crea un pool de sesiones nuevo con la configuración actual"""
+        # Crear DSN (Data Source Name)
+        dsn = cx_Oracle.makedsn(
+            host=self.host,
+            port=self.port,
+            service_name=self.service_name
+        )
+
+        # Crear pool de sesiones compartido por todos los hilos de Flask
+        pool = cx_Oracle.SessionPool(
+            user=self.username,
+            password=self.password,
+            dsn=dsn,
+            min=self.pool_min,
+            max=self.pool_max,
+            increment=self.pool_increment,
+            connectiontype=PooledConnection,
+            threaded=True,
+            getmode=cx_Oracle.SPOOL_ATTRVAL_TIMEDWAIT,
+            wait_timeout=self.pool_wait_timeout_ms,
+            session_callback=self._warm_session,
+            encoding="UTF-8"
+        )
+        # La caché debe poder alojar todas las sentencias estáticas; las
+        # dinámicas compiten por el resto con el LRU de la propia caché
+        pool.stmtcachesize = max(self.stmt_cache_size, len(self.statements) + 10)
+        return pool
+
+    def _warm_session(self, connection, requested_tag):
+        """Parsea las sentencias estáticas en cada sesión nueva del pool
+
+        prepare() solo arma la sentencia en el cliente; parse() la lleva al
+        servidor, y al cerrar el cursor queda parseada en la caché de
+        sentencias de la sesión. Las dinámicas se parsean al usarlas.
+        """
+        connection.module = SESSION_MODULE
+        for statement in self.statements.all():
+            cursor = connection.cursor()
+            try:
+                cursor.parse(statement.sql)
+            except cx_Oracle.Error as error:
+                print(f"Error preparando sentencia {statement.name}: {error}")
+            finally:
+                cursor.close()
+        self.statements.record_warmup()
+
+    def statement(self, name, sql, expected_rows=None, coalesce=False, returning=None, dynamic=False):
+        """Declara una sentencia fija en el registro (ver StatementRegistry)"""
+        return self.statements.register(name, sql, expected_rows, coalesce, returning, dynamic)
+
+    def connect(self):
+        """Crea el pool de sesiones con Oracle Database"""
+        try:
+            self.pool = self._create_pool()
+            print(f"Pool de sesiones creado en Oracle Database "
+                  f"(min={self.pool_min}, max={self.pool_max}, increment={self.pool_increment})")
+            self.supervisor.start()
+            return True
+
+        except cx_Oracle.Error as error:
+            print(f"Error al conectar con Oracle: {error}")
+            return False
+
+    def reconnect(self):
+        """Sustituye el pool actual por uno nuevo sin cortar las sesiones en uso"""
+        try:
+            new_pool = self._create_pool()
+        except cx_Oracle.Error as error:
+            print(f"Error al reconectar con Oracle: {error}")
+            return False
+
+        old_pool, self.pool = self.pool, new_pool
+        if old_pool is not None:
+            try:
+                # Las sesiones prestadas se devuelven al pool viejo al terminar
+                old_pool.close(force=False)
+            except cx_Oracle.Error:
+                pass
+        print("Pool de sesiones Oracle reconstruido")
+        return True
+
+    def disconnect(self):
+        """Cierra el pool de sesiones con Oracle Database"""
+        try:
+            if self.pool:
+                self.pool.close(force=True)
+                print("Pool de sesiones cerrado")
+        except:
+            # El pool ya está cerrado o no es válido
+            pass
+        finally:
+            self.pool = None
+
+    @contextmanager
+    def acquire(self, bind=True):
+        """Toma una sesión del pool (o la que ya tiene el hilo) y la devuelve al terminar"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            yield connection
+            return
+
+        if not self.breaker.allow_request():
+            raise self._unavailable("Base de datos no disponible temporalmente")
+
+        try:
+            if not self.pool:
+                print("Reconectando a Oracle...")
+                if not self.connect():
+                    raise cx_Oracle.InterfaceError("No hay pool de sesiones disponible")
+
+            # La validez de la sesión la vigila el supervisor, no un ping por sentencia
+            pool = self.pool
+            connection = pool.acquire()
+        except cx_Oracle.Error as error:
+            self.breaker.record_failure(error)
+            raise self._unavailable(f"No se pudo obtener sesión de Oracle: {error}") from error
+        with self._stats_lock:
+            self._acquired += 1
+
+        # Por defecto cada llamada usa el límite de DML; las lecturas lo bajan
+        connection.call_timeout = self.dml_timeout_ms
+        if bind:
+            self._local.connection = connection
+        dead = False
+        failure = None
+        try:
+            yield connection
+        except Exception as error:
+            if isinstance(error, cx_Oracle.Error) and is_unavailable_error(error):
+                failure = error
+            if isinstance(error, cx_Oracle.Error) and is_dead_session_error(error):
+                dead = True
+                self.supervisor.notify_failure(error)
+            else:
+                # No devolver al pool una transacción a medias
+                try:
+                    connection.rollback()
+                except cx_Oracle.Error:
+                    pass
+            raise
+        finally:
+            # Cualquier salida que no sea una caída cuenta como Oracle respondiendo
+            if failure is not None:
+                self.breaker.record_failure(failure)
+                # La excepción original sigue su curso; la petición responderá 503
+                self._local.unavailable = DatabaseUnavailableError(
+                    f"Base de datos no disponible: {failure}", self.breaker.retry_after())
+            else:
+                self.breaker.record_success()
+            if bind:
+                self._local.connection = None
+            if dead:
+                self._drop(pool, connection)
+            else:
+                self._release(pool, connection)
+
+    def in_session(self):
+        """Indica si el hilo actual ya tiene una sesión tomada del pool"""
+        return getattr(self._local, 'connection', None) is not None
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa varias escrituras en una sola sesión y un solo commit
+
+        Dentro del bloque execute_dml/execute_many no confirman: al salir sin
+        errores se hace un único commit y se ejecutan los callbacks de
+        on_commit; si el bloque lanza una excepción se deshace todo. Un
+        bloque anidado se une a la transacción en curso.
+        """
+        if self.in_transaction():
+            yield self._local.connection
+            return
+        with self.acquire() as connection:
+            self._local.on_commit = []
+            try:
+                yield connection
+                connection.call_timeout = self.dml_timeout_ms
+                connection.commit()
+                callbacks = self._local.on_commit
+            finally:
+                self._local.on_commit = None
+        for callback in callbacks:
+            callback()
+
+    def in_transaction(self):
+        """Indica si el hilo actual está dentro de db.transaction()"""
+        return getattr(self._local, 'on_commit', None) is not None
+
+    def on_commit(self, callback):
+        """Ejecuta callback tras el commit de la transacción en curso (o ya mismo si no hay)"""
+        if self.in_transaction():
+            self._local.on_commit.append(callback)
+        else:
+            callback()
+
+    def _release(self, pool, connection):
+        """Devuelve una sesión al pool del que salió"""
+        try:
+            connection.close_prepared_cursors()
+            pool.release(connection)
+        except cx_Oracle.Error as error:
+            print(f"Error devolviendo sesión al pool: {error}")
+        with self._stats_lock:
+            self._released += 1
+
+    def _drop(self, pool, connection):
+        """Descarta una sesión inválida del pool"""
+        try:
+            pool.drop(connection)
+        except cx_Oracle.Error:
+            pass
+        with self._stats_lock:
+            self._dropped += 1
+
+    def get_pool_stats(self):
+        """Retorna estadísticas del pool de sesiones"""
+        stats = {
+            'min': self.pool_min,
+            'max': self.pool_max,
+            'increment': self.pool_increment,
+            'opened': 0,
+            'busy': 0,
+            'acquired': self._acquired,
+            'released': self._released,
+            'dropped': self._dropped
+        }
+        if self.pool:
+            try:
+                stats['opened'] = self.pool.opened
+                stats['busy'] = self.pool.busy
+            except cx_Oracle.Error:
+                pass
+        return stats
+
+    def get_write_stats(self):
+        """Retorna las métricas del commit grupal de escrituras"""
+        return self.coalescer.get_stats()
+
+    def get_statement_stats(self):
+        """Retorna contadores del registro de sentencias, caché y tamaños de lote"""
+        stats = self.statements.get_stats()
+        stats['cache_size'] = self.pool.stmtcachesize if self.pool else self.stmt_cache_size
+        stats['parses'] = self.get_parse_stats() if self.pool else None
+        return stats
+
+    def get_parse_stats(self):
+        """Parses y ejecuciones de las sesiones del pool según v$sesstat
+
+        hits son las ejecuciones que no necesitaron parse (sentencia tomada
+        de la caché de la sesión o cursor reutilizado) y misses los parses;
+        con carga estable misses debe crecer mucho más despacio que hits.
+        Suma solo las sesiones abiertas ahora (module = SESSION_MODULE) y
+        requiere acceso a v$sesstat/v$session (None si no lo hay). Con el
+        circuito abierto o a medio abrir también es None: un sondeo de
+        monitoreo no debe ocupar la única petición de prueba.
+        """
+        if not self.breaker.is_closed():
+            return None
+        try:
+            rows = self.execute_query(PARSE_STATS_SQL, {'module': SESSION_MODULE})
+        except DatabaseUnavailableError:
+            return None
+        if not rows:
+            return None
+        values = {row['NAME']: int(row['VALUE'] or 0) for row in rows}
+        executions = values.get('execute count', 0)
+        parses = values.get('parse count (total)', 0)
+        hits = max(executions - parses, 0)
+        return {
+            'executions': executions,
+            'hits': hits,
+            'misses': parses,
+            'hard_parses': values.get('parse count (hard)', 0),
+            'session_cursor_cache_hits': values.get('session cursor cache hits', 0),
+            'hit_ratio': round(hits / executions, 4) if executions else None
+        }
+
+    def get_health(self):
+        """Retorna el último estado de salud conocido de la base de datos"""
+        health = self.supervisor.get_state()
+        health['breaker'] = self.breaker.get_state()
+        return health
+
+    def _unavailable(self, message):
+        """Crea un DatabaseUnavailableError y lo recuerda para la petición en curso"""
+        error = DatabaseUnavailableError(message, self.breaker.retry_after())
+        self._local.unavailable = error
+        return error
+
+    def pop_unavailable_error(self):
+        """Retorna (y olvida) la última caída de Oracle vista por el hilo actual"""
+        error = getattr(self._local, 'unavailable', None)
+        self._local.unavailable = None
+        return error
+
+    def _fetch_all(self, query, params, arraysize=None, prefetchrows=None, columnar=False):
+        """Ejecuta la consulta en una sesión del pool y retorna columnas y filas"""
+        with self.acquire() as connection:
+            connection.call_timeout = self.read_timeout_ms
+            cursor, prepared = self._cursor(connection, query, columnar)
+            try:
+                arraysize, prefetchrows = self._tune_cursor(cursor, query, arraysize, prefetchrows)
+                self._execute(cursor, query, params)
+
+                # Obtener nombres de columnas
+                columns = [desc[0] for desc in cursor.description]
+
+                # Obtener datos
+                rows = cursor.fetchall()
+            finally:
+                if not prepared:
+                    cursor.close()
+        if isinstance(query, Statement):
+            self.statements.observe_rows(query, len(rows), arraysize, prefetchrows)
+        return columns, rows
+
+    def _tune_cursor(self, cursor, query, arraysize=None, prefetchrows=None):
+        """Fija arraysize/prefetchrows del cursor; los valores explícitos mandan"""
+        if isinstance(query, Statement):
+            tuned_arraysize, tuned_prefetchrows = self.statements.fetch_sizes(query)
+        else:
+            tuned_arraysize, tuned_prefetchrows = self.statements.default_arraysize, 2
+        if arraysize is None:
+            arraysize = tuned_arraysize
+        if prefetchrows is None:
+            prefetchrows = min(tuned_prefetchrows, arraysize)
+        cursor.arraysize = arraysize
+        cursor.prefetchrows = prefetchrows
+        return arraysize, prefetchrows
+
+    def _cursor(self, connection, query, columnar=False):
+        """Retorna (cursor, preparado): cursor reutilizable si query es un Statement"""
+        if isinstance(query, Statement):
+            cursor, reused = connection.prepared_cursor(query, columnar)
+            self.statements.record(query, reused)
+            return cursor, True
+        cursor = connection.cursor()
+        if columnar:
+            cursor.outputtypehandler = native_output_handler
+        return cursor, False
+
+    def _execute(self, cursor, query, params):
+        """Ejecuta query (texto o Statement) en el cursor"""
+        sql = query.sql if isinstance(query, Statement) else query
+        if params:
+            cursor.execute(sql, self._bind_values(cursor.connection, params))
+        else:
+            cursor.execute(sql)
+
+    def _bind_values(self, connection, params):
+        """Convierte las NumberList de params en colecciones de la sesión"""
+        if not isinstance(params, dict) or not any(isinstance(value, NumberList) for value in params.values()):
+            return params
+        return {name: connection.number_list(value) if isinstance(value, NumberList) else value
+                for name, value in params.items()}
+
+    def execute_query(self, query, params=None, arraysize=None, prefetchrows=None, columnar=False):
+        """Ejecuta una consulta SELECT y retorna los resultados
+
+        arraysize/prefetchrows permiten forzar el tamaño de lote de esta
+        llamada; si se omiten se eligen según las filas esperadas/observadas.
+        Con columnar=True retorna un ColumnarResult (tuplas por fila, números
+        y fechas ya convertidos) en lugar de una lista de diccionarios.
+        """
+        try:
+            try:
+                columns, rows = self._fetch_all(query, params, arraysize, prefetchrows, columnar)
+            except cx_Oracle.Error as error:
+                # Una lectura que cae en una sesión muerta se reintenta una vez
+                # con otra sesión (solo si no forma parte de un bloque mayor)
+                if self.in_session() or not is_dead_session_error(error):
+                    raise
+                columns, rows = self._fetch_all(query, params, arraysize, prefetchrows, columnar)
+
+            if columnar:
+                return ColumnarResult(columns, rows)
+
+            # Convertir a lista de diccionarios
+            result = []
+            for row in rows:
+                result.append(dict(zip(columns, row)))
+
+            return result
+
+        except cx_Oracle.Error as error:
+            print(f"Error ejecutando consulta: {error}")
+            if is_unavailable_error(error):
+                raise self._unavailable(f"Base de datos no disponible: {error}") from error
+            return ColumnarResult([], []) if columnar else []
+
+    def stream_query(self, query, params=None, arraysize=None, columnar=False):
+        """Ejecuta una consulta SELECT y la recorre por lotes (generador)
+
+        Cada lote es una lista de diccionarios con hasta arraysize filas (o
+        un ColumnarResult con columnar=True, con números y fechas ya
+        convertidos y el tipo de cada columna). La sesión se retiene hasta
+        agotar o cerrar el generador, así la memoria no depende del tamaño
+        de la tabla.
+        """
+        try:
+            total = 0
+            with self.acquire(bind=False) as connection:
+                connection.call_timeout = self.read_timeout_ms
+                cursor, prepared = self._cursor(connection, query, columnar)
+                try:
+                    arraysize, prefetchrows = self._tune_cursor(cursor, query, arraysize)
+                    self._execute(cursor, query, params)
+                    columns = [desc[0] for desc in cursor.description]
+                    kinds = column_kinds(cursor.description) if columnar else None
+                    while True:
+                        rows = cursor.fetchmany(arraysize)
+                        if not rows:
+                            break
+                        total += len(rows)
+                        if columnar:
+                            yield ColumnarResult(columns, rows, kinds)
+                        else:
+                            yield [dict(zip(columns, row)) for row in rows]
+                finally:
+                    if not prepared:
+                        cursor.close()
+            if isinstance(query, Statement):
+                self.statements.observe_rows(query, total, arraysize, prefetchrows)
+
+        except cx_Oracle.Error as error:
+            print(f"Error recorriendo consulta: {error}")
+            if is_unavailable_error(error):
+                raise self._unavailable(f"Base de datos no disponible: {error}") from error
+            raise
+
+    def execute_dml(self, query, params=None):
+        """Ejecuta operaciones INSERT, UPDATE, DELETE (confirma salvo dentro de db.transaction())
+
+        Con ORACLE_WRITE_COALESCE_MS > 0 las sentencias marcadas con
+        coalesce se agrupan con las concurrentes (ver WriteCoalescer).
+        """
+        if self._can_coalesce(query, params):
+            return self.coalescer.submit(query, params)
+        try:
+            with self.acquire() as connection:
+                connection.call_timeout = self.dml_timeout_ms
+                cursor, prepared = self._cursor(connection, query)
+                try:
+                    self._execute(cursor, query, params)
+
+                    if not self.in_transaction():
+                        connection.commit()
+                    affected_rows = cursor.rowcount
+                finally:
+                    if not prepared:
+                        cursor.close()
+
+            return affected_rows
+
+        except cx_Oracle.Error as error:
+            print(f"Error ejecutando DML: {error}")
+            if is_unavailable_error(error):
+                raise self._unavailable(f"Base de datos no disponible: {error}") from error
+            return None
+
+    def execute_many(self, query, rows, batch_size=1000):
+        """Ejecuta un INSERT/UPDATE/MERGE para muchas filas con DML por arreglos
+
+        Las filas se envían en lotes de batch_size con executemany y
+        batcherrors: una fila que falla no aborta el resto, y todo se confirma
+        con un solo commit. Retorna (filas afectadas, [(índice, error), ...])
+        o None si falla la ejecución.
+        """
+        try:
+            affected_rows = 0
+            errors = []
+            with self.acquire() as connection:
+                connection.call_timeout = self.dml_timeout_ms
+                cursor, prepared = self._cursor(connection, query)
+                sql = query.sql if isinstance(query, Statement) else query
+                try:
+                    for start in range(0, len(rows), batch_size):
+                        cursor.executemany(sql, rows[start:start + batch_size], batcherrors=True)
+                        affected_rows += cursor.rowcount
+                        for error in cursor.getbatcherrors():
+                            errors.append((start + error.offset, error.message))
+
+                    if not self.in_transaction():
+                        connection.commit()
+                finally:
+                    if not prepared:
+                        cursor.close()
+
+            return affected_rows, errors
+
+        except cx_Oracle.Error as error:
+            print(f"Error ejecutando DML por lotes: {error}")
+            if is_unavailable_error(error):
+                raise self._unavailable(f"Base de datos no disponible: {error}") from error
+            return None
+
+    def _can_coalesce(self, query, params):
+        return (self.coalescer.enabled and isinstance(query, Statement) and query.coalesce
+                and isinstance(params, dict) and not self.in_session())
+
+    def execute_returning(self, query, params):
+        """Ejecuta un INSERT/UPDATE ... RETURNING ... INTO de una fila
+
+        Retorna la fila escrita tal como quedó en la tabla (columnas en
+        mayúsculas, como execute_query; incluye el ID asignado por la
+        secuencia) en el mismo viaje que la escritura; {} si no afectó
+        ninguna fila o None si falla.
+        """
+        if self._can_coalesce(query, params):
+            return self.coalescer.submit(query, params)
+        try:
+            with self.acquire() as connection:
+                connection.call_timeout = self.dml_timeout_ms
+                cursor, prepared = self._cursor(connection, query)
+                try:
+                    variables = returning_vars(cursor, query)
+                    cursor.execute(query.sql, dict(params, **variables))
+
+                    if not self.in_transaction():
+                        connection.commit()
+                    row = returned_row(query, variables) if cursor.rowcount else {}
+                finally:
+                    if not prepared:
+                        cursor.close()
+
+            return row
+
+        except cx_Oracle.Error as error:
+            print(f"Error ejecutando DML: {error}")
+            if is_unavailable_error(error):
+                raise self._unavailable(f"Base de datos no disponible: {error}") from error
+            return None
+
+    def execute_group(self, query, rows):
+        """Ejecuta un grupo de DML de una fila con un executemany y un commit
+
+        Retorna las filas afectadas por cada fila del grupo (None en las que
+        fallaron; con RETURNING, la fila escrita como en execute_returning);
+        si falla la ejecución completa, None para todas.
+        """
+        try:
+            with self.acquire() as connection:
+                connection.call_timeout = self.dml_timeout_ms
+                cursor, prepared = self._cursor(connection, query)
+                try:
+                    variables = returning_vars(cursor, query, len(rows)) if query.returning else None
+                    if variables:
+                        cursor.setinputsizes(**variables)
+                    cursor.executemany(query.sql, rows, batcherrors=True, arraydmlrowcounts=True)
+                    failed = {error.offset: error.message for error in cursor.getbatcherrors()}
+                    counts = cursor.getarraydmlrowcounts()
+                    connection.commit()
+                finally:
+                    if not prepared:
+                        cursor.close()
+            for offset, message in failed.items():
+                print(f"Error ejecutando DML agrupado: {message}")
+            if len(counts) != len(rows):
+                # Conteos solo de las filas que no fallaron
+                succeeded = iter(counts)
+                counts = [0 if offset in failed else next(succeeded, 1) for offset in range(len(rows))]
+            if variables:
+                return [None if offset in failed else returned_row(query, variables, offset) if counts[offset] else {}
+                        for offset in range(len(rows))]
+            return [None if offset in failed else counts[offset] for offset in range(len(rows))]
+
+        except cx_Oracle.Error as error:
+            print(f"Error ejecutando DML agrupado: {error}")
+            if is_unavailable_error(error):
+                raise self._unavailable(f"Base de datos no disponible: {error}") from error
+            return [None] * len(rows)
+
+# Instancia global de la base de datos (cada nodo la configura en su database.py)
+db = OracleDatabase()
@@ -0,0 +1,125 @@
+import gzip
+import json
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+# Serializadores opcionales: sin ellos se usa el json estándar / solo JSON / solo gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+# Tamaño mínimo (bytes) a partir del cual se comprime la respuesta
+COMPRESS_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', '5'))
+BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', '4'))
+
+def encode_value(value):
+    """Convierte los tipos que devuelve Oracle y que el serializador no conoce"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if hasattr(value, 'to_dict'):
+        # ColumnarResult y similares
+        return value.to_dict()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de la app: orjson si está instalado y MessagePack por Accept
+
+    Todas las respuestas de jsonify (listados, auditoría, errores) pasan por
+    response(), que elige el formato según la cabecera Accept.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=encode_value).decode('utf-8')
+        kwargs.setdefault('default', encode_value)
+        kwargs.setdefault('ensure_ascii', False)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if msgpack is not None and wants_msgpack():
+            body = msgpack.packb(obj, default=encode_value, use_bin_type=True)
+            response = self._app.response_class(body, mimetype=MSGPACK_MIMETYPES[0])
+        elif orjson is not None:
+            body = orjson.dumps(obj, default=encode_value, option=orjson.OPT_APPEND_NEWLINE)
+            response = self._app.response_class(body, mimetype=self.mimetype)
+        else:
+            response = self._app.response_class(
+                self.dumps(obj, separators=(',', ':')) + '\n', mimetype=self.mimetype)
+        response.vary.add('Accept')
+        return response
+
+def wants_msgpack():
+    """Indica si el cliente prefiere MessagePack sobre JSON (cabecera Accept)"""
+    best = request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES)
+    return best in MSGPACK_MIMETYPES
+
+def choose_encoding(accept_encoding):
+    """Elige la compresión a usar: br si está disponible, si no gzip"""
+    if brotli is not None and accept_encoding['br']:
+        return 'br'
+    if accept_encoding['gzip']:
+        return 'gzip'
+    return None
+
+def compress_response(response):
+    """Comprime (br/gzip) las respuestas completas por encima del umbral"""
+    if (response.is_streamed or response.direct_passthrough
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers):
+        # Las respuestas en streaming se envían por lotes: no se comprimen aquí
+        return response
+    response.vary.add('Accept-Encoding')
+    if response.content_length is not None and response.content_length < COMPRESS_MIN_BYTES:
+        return response
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    if encoding == 'br':
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    tag, weak = response.get_etag()
+    if tag and not weak:
+        # Cada codificación es otra representación: su ETag fuerte lleva un sufijo
+        response.set_etag(f'{tag}-{encoding}')
+    return response
+
+def init_encoders(app):
+    """Instala el proveedor JSON rápido y la compresión de respuestas en la app"""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
+    print(f"Codificación de respuestas: json={'orjson' if orjson else 'json'}, "
+          f"msgpack={'sí' if msgpack else 'no'}, compresión={'br/gzip' if brotli else 'gzip'}")
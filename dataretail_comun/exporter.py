@@ -0,0 +1,170 @@
+import csv
+import io
+import os
+from collections import namedtuple
+from flask import Response, jsonify, request, stream_with_context
+from .database import db
+from .responses import peek_batches
+
+# Formatos por columnas opcionales: sin pyarrow solo se exporta CSV
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Filas por lote leído del cursor durante una exportación
+EXPORT_ARRAYSIZE = int(os.getenv('EXPORT_ARRAYSIZE', '5000'))
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# Consulta a exportar: sentencia, parámetros, columnas (en mayúsculas), columnas
+# enteras (PK) y transformaciones {columna: función} de la salida
+ExportQuery = namedtuple('ExportQuery', 'statement params columns int_columns transforms')
+
+def resource_export(resource, args):
+    """ExportQuery de un Resource con la proyección, filtros y orden de la URL"""
+    criteria = resource.parse_criteria(args)
+    fields = criteria.fields or resource.select_columns
+    return ExportQuery(resource.query('get_all', criteria), criteria.params(),
+                       [field.upper() for field in fields], (resource.pk.upper(),),
+                       resource.transforms)
+
+def export_batches(export):
+    """Lotes (ColumnarResult) de la exportación, con las transformaciones aplicadas"""
+    for batch in db.stream_query(export.statement, export.params or None,
+                                 arraysize=EXPORT_ARRAYSIZE, columnar=True):
+        for column, function in export.transforms.items():
+            batch = batch.map_column(column, function)
+        yield batch
+
+def csv_chunks(columns, batches):
+    """Escribe el CSV lote a lote: el encabezado y luego cada lote como un bloque de texto"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.lower() for column in columns])
+    yield buffer.getvalue()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch.rows)
+        yield buffer.getvalue()
+
+class _ChunkSink(io.RawIOBase):
+    """Archivo de solo escritura que acumula bytes hasta que se vacían con drain()"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def arrow_schema(columns, kinds, int_columns):
+    """Esquema Arrow a partir del tipo de cada columna (ver database.column_kinds)"""
+    types = {'int': pyarrow.int64(), 'float': pyarrow.float64(), 'number': pyarrow.float64()}
+    fields = []
+    for index, column in enumerate(columns):
+        kind = kinds[index] if kinds else 'text'
+        if column in int_columns:
+            field_type = pyarrow.int64()
+        else:
+            field_type = types.get(kind, pyarrow.string())
+        fields.append(pyarrow.field(column.lower(), field_type))
+    return pyarrow.schema(fields)
+
+def arrow_chunks(export, batches, parquet=False):
+    """Escribe Arrow IPC (stream) o Parquet lote a lote; cada lote se envía al escribirse"""
+    first = next(batches, None)
+    columns = first.columns if first is not None else export.columns
+    schema = arrow_schema(columns, first.kinds if first is not None else None, export.int_columns)
+    sink = _ChunkSink()
+    if parquet:
+        writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+
+    def write(batch):
+        arrays = [pyarrow.array(batch.column(column), type=field.type)
+                  for column, field in zip(columns, schema)]
+        record_batch = pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+        if parquet:
+            # Un grupo de filas por lote
+            writer.write_table(pyarrow.Table.from_batches([record_batch]))
+        else:
+            writer.write_batch(record_batch)
+
+    try:
+        if first is not None:
+            write(first)
+            yield sink.drain()
+        for batch in batches:
+            write(batch)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def export_response(export, name, export_format):
+    """Respuesta en streaming de una exportación en el formato pedido"""
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    first, batches = peek_batches(export_batches(export))
+    if export_format == 'csv':
+        body = csv_chunks(first.columns if first is not None else export.columns, batches)
+    else:
+        body = arrow_chunks(export, batches, parquet=(export_format == 'parquet'))
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{name}.{extension}"'
+    return response
+
+def register_export_routes(app, resources, extra=None):
+    """Registra GET /api/export/<recurso>?format=csv|arrow|parquet
+
+    resources son los Resource del nodo; extra agrega otras consultas
+    exportables {nombre: función(args) -> ExportQuery} (p. ej. la auditoría).
+    Los listados admiten los mismos ?fields=, filtros y ?sort= que la API.
+    """
+    sources = {resource.endpoint: (lambda args, resource=resource: resource_export(resource, args))
+               for resource in resources}
+    sources.update(extra or {})
+
+    @app.route('/api/export/<name>', methods=['GET'])
+    def export_table(name):
+        source = sources.get(name)
+        if source is None:
+            return jsonify({'success': False, 'error': f'Recurso no encontrado: {name}'}), 404
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'success': False,
+                            'error': f"Formato no válido: {export_format} (csv, arrow o parquet)"}), 400
+        if export_format != 'csv' and pyarrow is None:
+            return jsonify({'success': False,
+                            'error': f'El formato {export_format} requiere pyarrow en el servidor'}), 501
+        try:
+            export = source(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        try:
+            return export_response(export, name, export_format)
+        except Exception as e:
+            print(f"ERROR exportando {name}: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Importación de archivos CSV hacia las tablas del nodo
+
+El archivo se lee por bloques de IMPORT_CHUNK_ROWS filas: cada bloque se
+valida y convierte columna por columna y se escribe con DML por arreglos
+(Resource.create_many), así la memoria no depende del tamaño del archivo.
+Las filas rechazadas se escriben en un archivo CSV aparte con la línea y
+el motivo.
+
+Uso (desde la carpeta de un nodo, ver importer.py del nodo):
+    python importer.py products productos.csv
+    python importer.py customers clientes.csv --mode upsert --rejects rechazos.csv
+"""
+
+import argparse
+import csv
+import io
+import os
+import re
+import secrets
+import sys
+import tempfile
+from datetime import datetime
+from flask import Response, jsonify, request, send_file, stream_with_context, url_for
+from .responses import NDJSON_MIMETYPE, wants_ndjson
+
+# Filas por bloque (una llamada a executemany y un commit por bloque)
+IMPORT_CHUNK_ROWS = int(os.getenv('IMPORT_CHUNK_ROWS', '1000'))
+# Carpeta de los archivos de rechazos de /api/import
+IMPORT_REJECTS_DIR = os.getenv('IMPORT_REJECTS_DIR', tempfile.gettempdir())
+# Errores por fila que se incluyen en la respuesta (el resto queda en el archivo)
+MAX_REPORTED_ERRORS = 100
+
+def read_chunks(reader, chunk_rows):
+    """Recorre un csv.reader por bloques: genera (números de línea, filas)"""
+    lines, chunk = [], []
+    for row in reader:
+        if not any(value.strip() for value in row):
+            # Líneas vacías: no son filas
+            continue
+        lines.append(reader.line_num)
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield lines, chunk
+            lines, chunk = [], []
+    if chunk:
+        yield lines, chunk
+
+def text_converter(value):
+    value = value.strip()
+    return value if value else None
+
+def number_converter(number_type):
+    def convert(value):
+        value = value.strip()
+        if not value:
+            return None
+        try:
+            return number_type(value)
+        except ValueError:
+            raise ValueError(f"no es un número: {value}")
+    return convert
+
+class CsvImport:
+    """Importación de un CSV hacia un Resource
+
+    Las columnas del encabezado se validan contra la tabla ('id' es alias de
+    la PK, obligatoria en modo upsert); las columnas fijas del fragmento
+    pueden venir en el archivo, pero solo con el valor del fragmento.
+    """
+
+    def __init__(self, resource, upsert=False, chunk_rows=IMPORT_CHUNK_ROWS, rejects_path=None):
+        self.resource = resource
+        self.upsert = upsert
+        self.chunk_rows = max(1, chunk_rows)
+        self.rejects_path = rejects_path
+        self.header = None
+        self.positions = {}
+        self.converters = {}
+        self.rows = 0
+        self.affected = 0
+        self.rejected = 0
+        self.errors = []
+        self._rejects_file = None
+        self._rejects_writer = None
+
+    def _read_header(self, header):
+        """Ubica las columnas del encabezado; ValueError si faltan o sobran columnas"""
+        resource = self.resource
+        names = [name.strip().lower() for name in header]
+        names = [resource.pk if name == 'id' else name for name in names]
+        unknown = [name for name in names if name not in resource.select_columns]
+        if unknown:
+            raise ValueError(f"Columnas desconocidas en el CSV: {', '.join(unknown)} "
+                             f"(disponibles: {', '.join(resource.select_columns)})")
+        required = [column for column in resource.writable if column not in resource.optional]
+        if self.upsert:
+            required.append(resource.pk)
+        missing = [column for column in required if column not in names]
+        if missing:
+            raise ValueError(f"Faltan columnas en el CSV: {', '.join(missing)}")
+        self.header = header
+        self.positions = {name: index for index, name in enumerate(names)
+                          if name in resource.writable or name in resource.fixed
+                          or (self.upsert and name == resource.pk)}
+        for name in self.positions:
+            column_type = int if name == resource.pk else resource.types.get(name, str)
+            self.converters[name] = text_converter if column_type is str else number_converter(column_type)
+
+    def coerce_chunk(self, rows):
+        """Convierte un bloque columna por columna: retorna (registros, {posición: error})"""
+        errors = {}
+        width = len(self.header)
+        for offset, row in enumerate(rows):
+            if len(row) != width:
+                errors[offset] = f"se esperaban {width} columnas y hay {len(row)}"
+        columns = {}
+        for name, index in self.positions.items():
+            convert = self.converters[name]
+            values = []
+            for offset, row in enumerate(rows):
+                if offset in errors:
+                    values.append(None)
+                    continue
+                try:
+                    values.append(convert(row[index]))
+                except ValueError as e:
+                    errors[offset] = f"{name}: {e}"
+                    values.append(None)
+            columns[name] = values
+        fixed = self.resource.fixed
+        for name in fixed:
+            if name not in columns:
+                continue
+            expected = fixed[name]
+            for offset, value in enumerate(columns.pop(name)):
+                if value is not None and value != expected and offset not in errors:
+                    errors[offset] = f"{name} debe ser '{expected}' en este nodo (valor: {value})"
+        records = []
+        for offset in range(len(rows)):
+            if offset in errors:
+                continue
+            record = {name: values[offset] for name, values in columns.items()}
+            if self.upsert:
+                record['id'] = record.pop(self.resource.pk)
+            records.append((offset, record))
+        return records, errors
+
+    def _reject(self, line, row, message):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+        if self.rejects_path is None:
+            return
+        if self._rejects_writer is None:
+            # El archivo de rechazos se crea con el primer rechazo
+            self._rejects_file = open(self.rejects_path, 'w', newline='', encoding='utf-8')
+            self._rejects_writer = csv.writer(self._rejects_file)
+            self._rejects_writer.writerow(['_linea', '_error'] + list(self.header))
+        self._rejects_writer.writerow([line, message] + list(row))
+
+    def write_chunk(self, lines, rows):
+        """Valida y escribe un bloque; retorna el progreso acumulado"""
+        records, errors = self.coerce_chunk(rows)
+        if records:
+            result = self.resource.create_many([record for offset, record in records], upsert=self.upsert)
+            if result is None:
+                for offset, record in records:
+                    errors[offset] = 'Error de base de datos al escribir el bloque'
+            else:
+                affected, batch_errors = result
+                self.affected += affected
+                for error in batch_errors:
+                    errors[records[error['index']][0]] = error['error']
+        for offset in sorted(errors):
+            self._reject(lines[offset], rows[offset], errors[offset])
+        self.rows += len(rows)
+        return self.progress()
+
+    def run(self, stream):
+        """Importa un archivo de texto abierto; genera el progreso después de cada bloque"""
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("El archivo CSV está vacío")
+        self._read_header(header)
+        try:
+            for lines, rows in read_chunks(reader, self.chunk_rows):
+                yield self.write_chunk(lines, rows)
+        finally:
+            if self._rejects_file is not None:
+                self._rejects_file.close()
+        print(f"Importación de {self.resource.plural}: {self.rows} filas, "
+              f"{self.affected} escritas, {self.rejected} rechazadas")
+
+    def progress(self):
+        return {'rows': self.rows, 'affected': self.affected, 'rejected': self.rejected}
+
+    def summary(self):
+        summary = self.progress()
+        summary.update({
+            'success': self.rejected == 0,
+            'resource': self.resource.endpoint,
+            'mode': 'upsert' if self.upsert else 'insert',
+            'errors': self.errors
+        })
+        return summary
+
+# Identificador de un archivo de rechazos: sin separadores de ruta
+REJECTS_ID = re.compile(r'import_\w+')
+
+def new_rejects_id(resource):
+    """Identificador del archivo de rechazos de una importación por la API"""
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"import_{resource.endpoint}_{stamp}_{secrets.token_hex(8)}"
+
+def rejects_path_for(rejects_id):
+    """Ruta en IMPORT_REJECTS_DIR del archivo de rechazos con ese identificador"""
+    return os.path.join(IMPORT_REJECTS_DIR, f"{rejects_id}.rechazos.csv")
+
+def register_import_routes(app, resources):
+    """Registra POST /api/import/<recurso> para las tablas escribibles del nodo
+
+    El CSV llega como cuerpo (text/csv) o como archivo 'file' de un
+    formulario multipart. Con ?stream=ndjson o 'Accept: application/x-ndjson'
+    se envía una línea de progreso por bloque y el resumen al final. Si hubo
+    rechazos, el resumen trae la URL de GET /api/import/rejects/<id>.
+    """
+    by_endpoint = {resource.endpoint: resource for resource in resources}
+
+    @app.route('/api/import/<endpoint>', methods=['POST'])
+    def import_csv(endpoint):
+        resource = by_endpoint.get(endpoint)
+        if resource is None:
+            return jsonify({'success': False, 'error': f'Recurso no encontrado: {endpoint}'}), 404
+        if resource.read_only:
+            return resource.read_only_response()
+        mode = request.args.get('mode', 'insert').lower()
+        if mode not in ('insert', 'upsert'):
+            return jsonify({'success': False, 'error': f'Modo no válido: {mode} (insert o upsert)'}), 400
+        try:
+            chunk_rows = int(request.args.get('chunk', IMPORT_CHUNK_ROWS))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'chunk debe ser un entero'}), 400
+        upload = request.files.get('file')
+        raw = upload.stream if upload is not None else request.stream
+        stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        rejects_id = new_rejects_id(resource)
+        job = CsvImport(resource, upsert=(mode == 'upsert'), chunk_rows=chunk_rows,
+                        rejects_path=rejects_path_for(rejects_id))
+
+        def summary():
+            result = job.summary()
+            result['rejects'] = url_for('download_import_rejects', rejects_id=rejects_id) if job.rejected else None
+            return result
+
+        progress = job.run(stream)
+        try:
+            # El encabezado se valida antes de responder
+            first = next(progress, None)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        if wants_ndjson():
+            dumps = app.json.dumps
+
+            def generate():
+                if first is not None:
+                    yield dumps(first) + '\n'
+                try:
+                    for step in progress:
+                        yield dumps(step) + '\n'
+                except Exception as e:
+                    print(f"ERROR importando {resource.plural}: {str(e)}")
+                    yield dumps({'success': False, 'error': str(e)}) + '\n'
+                    return
+                yield dumps(summary()) + '\n'
+
+            return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+        try:
+            for step in progress:
+                pass
+        except Exception as e:
+            print(f"ERROR importando {resource.plural}: {str(e)}")
+            return jsonify({'success': False, 'error': str(e), 'progress': job.progress()}), 500
+        return jsonify(summary())
+
+    @app.route('/api/import/rejects/<rejects_id>', methods=['GET'])
+    def download_import_rejects(rejects_id):
+        path = rejects_path_for(rejects_id)
+        if not REJECTS_ID.fullmatch(rejects_id) or not os.path.isfile(path):
+            return jsonify({'success': False, 'error': 'Archivo de rechazos no encontrado'}), 404
+        return send_file(path, mimetype='text/csv', as_attachment=True,
+                         download_name=f"{rejects_id}.rechazos.csv")
+
+def load_resources():
+    """Recursos del nodo: models.RESOURCES en el maestro, app.RESOURCES en el esclavo"""
+    try:
+        from models import RESOURCES
+    except ImportError:
+        from app import RESOURCES
+    return RESOURCES
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Importa un CSV a una tabla del nodo')
+    parser.add_argument('resource', help='recurso de la API (products, customers, ...)')
+    parser.add_argument('path', help='archivo CSV con encabezado')
+    parser.add_argument('--mode', choices=('insert', 'upsert'), default='insert')
+    parser.add_argument('--chunk', type=int, default=IMPORT_CHUNK_ROWS, help='filas por bloque')
+    parser.add_argument('--rejects', help='archivo de rechazos (por defecto <archivo>.rechazos.csv)')
+    args = parser.parse_args(argv)
+
+    resources = {resource.endpoint: resource for resource in load_resources()}
+    resource = resources.get(args.resource)
+    if resource is None:
+        print(f"❌ Recurso desconocido: {args.resource} (disponibles: {', '.join(resources)})")
+        return 2
+    if resource.read_only:
+        print(f"❌ {resource.plural} son de solo lectura en este nodo")
+        return 2
+
+    rejects_path = args.rejects or os.path.splitext(args.path)[0] + '.rechazos.csv'
+    job = CsvImport(resource, upsert=(args.mode == 'upsert'), chunk_rows=args.chunk,
+                    rejects_path=rejects_path)
+    try:
+        with open(args.path, newline='', encoding='utf-8-sig') as stream:
+            for step in job.run(stream):
+                print(f"📦 {step['rows']} filas leídas, {step['affected']} escritas, "
+                      f"{step['rejected']} rechazadas")
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if job.rejected:
+        print(f"⚠️ Rechazos en {rejects_path}")
+    print("✅ Importación terminada")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
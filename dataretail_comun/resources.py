@@ -0,0 +1,898 @@
+from flask import jsonify, request
+from .database import db, NumberList
+from .responses import (wants_stream, stream_rows, wants_page, paged_response,
+                       wants_columnar, columnar_response, conditional_get, hashed_get,
+                       DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+# Máximo de filas por POST /bulk y filas por executemany
+BULK_MAX_ROWS = 50000
+BULK_BATCH_SIZE = 1000
+
+def sql_literal(value):
+    """Representa un valor fijo de los metadatos como literal SQL"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+def parse_fields(value, columns, required=(), aliases=None):
+    """Valida ?fields= contra la lista blanca de columnas
+
+    Retorna las columnas pedidas en el orden de la tabla (más las required,
+    p. ej. la PK que necesitan las páginas) o None si no se pidió proyección;
+    ValueError si alguna columna no existe.
+    """
+    if not value:
+        return None
+    aliases = aliases or {}
+    requested = set()
+    for field in value.split(','):
+        field = field.strip().lower()
+        if field:
+            requested.add(aliases.get(field, field))
+    unknown = requested.difference(columns)
+    if unknown:
+        raise ValueError(f"Campos no permitidos: {', '.join(sorted(unknown))} "
+                         f"(disponibles: {', '.join(columns)})")
+    requested.update(required)
+    return tuple(column for column in columns if column in requested)
+
+def parse_ids(value):
+    """Valida ?ids=1,2,3: retorna los IDs sin repetir en el orden pedido
+
+    ValueError si alguno no es entero o si se piden más de MAX_PAGE_SIZE.
+    """
+    ids = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            ids.append(int(item))
+        except ValueError:
+            raise ValueError(f"ID inválido: {item}")
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise ValueError("ids vacío: se esperaba ?ids=1,2,3")
+    if len(ids) > MAX_PAGE_SIZE:
+        raise ValueError(f"Se pueden pedir hasta {MAX_PAGE_SIZE} IDs por consulta")
+    return ids
+
+def many_response(value, get_many, fields=None):
+    """Respuesta de ?ids=: {"data": {"id": fila, ...}, "missing": [ids]}
+
+    get_many(ids, fields) retorna ({id: fila}, IDs faltantes), como
+    Resource.get_many o fetch_many.
+    """
+    try:
+        ids = parse_ids(value)
+    except ValueError as e:
+        return jsonify({'success': False, 'data': {}, 'error': str(e)}), 400
+    rows, missing = get_many(ids, fields)
+    return jsonify({
+        'success': True,
+        'data': {str(record_id): row for record_id, row in rows.items()},
+        'missing': missing
+    })
+
+def fetch_many(statement, ids, pk):
+    """Lee por lotes de IDs con una sola ejecución: retorna ({id: fila}, IDs faltantes)
+
+    statement filtra por la colección :ids; pk es la columna (en mayúsculas)
+    con la que se indexan las filas.
+    """
+    if not ids:
+        return {}, []
+    rows = db.execute_query(statement, {'ids': NumberList(ids)},
+                            arraysize=len(ids), prefetchrows=len(ids) + 1)
+    found = {row[pk]: row for row in rows}
+    return ({record_id: found[record_id] for record_id in ids if record_id in found},
+            [record_id for record_id in ids if record_id not in found])
+
+def audit_record_id(entry):
+    """ID de la fila de un registro de auditoría (primer campo de nuevo, o de anterior en las bajas)"""
+    text = entry['ANTERIOR'] if entry['TIPO_OPERACION'] == 'D' else entry['NUEVO']
+    if not text:
+        return None
+    try:
+        return int(text.split('|', 1)[0])
+    except ValueError:
+        return None
+
+# Filtros admitidos en los listados: sufijo del parámetro y predicado SQL
+FILTER_OPERATORS = {
+    'eq': ('', "{column} = :{param}"),
+    'min': ('_min', "{column} >= :{param}"),
+    'max': ('_max', "{column} <= :{param}"),
+    'prefix': ('_prefix', "{column} LIKE :{param} ESCAPE '\\'"),
+}
+
+def filter_value(operator, value):
+    """Convierte el valor de un filtro de la URL al tipo que se liga en SQL"""
+    if operator in ('min', 'max'):
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    if operator == 'prefix':
+        # El prefijo es literal: se escapan los comodines de LIKE
+        escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return escaped + '%'
+    return value
+
+class Criteria:
+    """Proyección, filtros y orden pedidos para un listado (ver Resource.parse_criteria)"""
+    __slots__ = ('fields', 'filters', 'sort', 'descending')
+
+    def __init__(self, fields=None, filters=None, sort=None, descending=False):
+        self.fields = fields
+        self.filters = filters or {}
+        self.sort = sort
+        self.descending = descending
+
+    def params(self):
+        """Valores ligados de los filtros"""
+        return {param: value for param, (column, operator, value) in self.filters.items()}
+
+def fetch_page(statement, params, limit, key):
+    """Ejecuta una sentencia de página y retorna (filas, clave de la última fila o None)
+
+    Se pide una fila de más para saber si hay página siguiente sin un COUNT;
+    key(fila) arma la clave que recibirá el próximo after.
+    """
+    params = dict(params, limit=limit + 1)
+    rows = db.execute_query(statement, params, arraysize=limit + 1, prefetchrows=limit + 2)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, key(rows[-1])
+
+class Resource:
+    """Tabla expuesta por la API: sentencias, CRUD, caché y rutas a partir de sus metadatos"""
+
+    def __init__(self, name, table, pk, columns, endpoint, label, plural,
+                 feminine=False, fixed=None, optional=None, id_strategy='sequence',
+                 sequence=None, read_only=False, transforms=None, descending=False,
+                 read_only_message=None, filters=None, sortable=None, types=None,
+                 audit=None, cache=None, mview=None):
+        self.name = name
+        self.table = table
+        self.pk = pk
+        self.columns = tuple(columns)
+        self.endpoint = endpoint
+        self.label = label
+        self.plural = plural
+        self.feminine = feminine
+        self.fixed = dict(fixed or {})
+        self.optional = dict(optional or {})
+        self.writable = tuple(column for column in self.columns if column not in self.fixed)
+        self.id_strategy = id_strategy
+        self.sequence = sequence
+        self.read_only = read_only
+        self.transforms = {column.upper(): function
+                           for column, function in (transforms or {}).items()}
+        self.descending = descending
+        self.read_only_message = read_only_message
+        self._listeners = []
+        self.select_columns = (pk,) + self.columns
+        self.filters = {}
+        for column, operators in (filters or {}).items():
+            for operator in operators:
+                self.filters[column + FILTER_OPERATORS[operator][0]] = (column, operator)
+        self.sortable = (pk,) + tuple(column for column in (sortable or ()) if column != pk)
+        self.types = dict(types or {})
+        self.audit = audit
+        self.mview = mview
+        self.cache = cache
+        if cache is not None:
+            self.on_change(lambda resource, operation, record_id: cache.invalidate(resource.name))
+
+        self._statements = {}
+        self.GET_ALL = self.query('get_all')
+        self.GET_BY_ID = self.query('get_by_id')
+        self.PAGE_FIRST = self.query('page_first')
+        self.PAGE_AFTER = self.query('page_after')
+        select_list = ', '.join(self.select_columns)
+        if audit:
+            # Cambios posteriores a una marca (id_auditoria), en orden; ver changes()
+            self.CHANGES = db.statement(f'{name}.changes', f"""
+                SELECT id_auditoria, tipo_operacion, anterior, nuevo
+                FROM {audit}
+                WHERE nombre_table = :tabla AND id_auditoria > :since
+                ORDER BY id_auditoria
+                FETCH FIRST :limit ROWS ONLY
+            """)
+            # Última marca de la tabla y su fecha (MAX por índice y acceso por PK); sin
+            # registros de auditoría (p. ej. triggers no instalados) se usa ORA_ROWSCN
+            self.VERSION = db.statement(f'{name}.version', f"""
+                SELECT v.version,
+                       (SELECT a.fecha FROM {audit} a WHERE a.id_auditoria = v.version) AS modificado,
+                       CASE WHEN v.version IS NULL THEN
+                           (SELECT NVL(MAX(ORA_ROWSCN), 0) || '.' || COUNT(*) FROM {table})
+                       END AS filas
+                FROM (SELECT MAX(id_auditoria) AS version FROM {audit} WHERE nombre_table = :tabla) v
+            """, 1)
+        elif mview:
+            # Vista materializada: solo cambia al refrescarse desde el maestro
+            self.VERSION = db.statement(f'{name}.version', """
+                SELECT MAX(last_refresh_date) AS modificado
+                FROM user_mviews
+                WHERE mview_name = :mview
+            """, 1)
+        else:
+            # Sin auditoría: SCN más alto de las filas; el conteo refleja las bajas
+            self.VERSION = db.statement(f'{name}.version', f"""
+                SELECT MAX(ORA_ROWSCN) AS version, COUNT(*) AS filas FROM {table}
+            """, 1)
+        if not read_only:
+            values_sql = ', '.join([self._next_id_sql()] + [self._value_sql(column) for column in self.columns])
+            # Alta y modificación devuelven la fila escrita (con el ID asignado) en el mismo viaje
+            returning = [(column, self._kind(column)) for column in self.select_columns]
+            returning_sql = (f"RETURNING {select_list} "
+                             f"INTO {', '.join(f':ret_{column}' for column in self.select_columns)}")
+            self.CREATE = db.statement(f'{name}.create', f"""
+                INSERT INTO {table} ({select_list})
+                VALUES ({values_sql})
+            """)
+            self.CREATE_RETURNING = db.statement(f'{name}.create_returning', f"""
+                INSERT INTO {table} ({select_list})
+                VALUES ({values_sql})
+                {returning_sql}
+            """, coalesce=(id_strategy == 'sequence'), returning=returning)
+            self.UPDATE = db.statement(f'{name}.update', f"""
+                UPDATE {table}
+                SET {', '.join(f'{column} = :{column}' for column in self.writable)}
+                WHERE {pk} = :id
+                {returning_sql}
+            """, coalesce=True, returning=returning)
+            self.DELETE = db.statement(f'{name}.delete', f"DELETE FROM {table} WHERE {pk} = :id",
+                                       coalesce=True)
+            if id_strategy != 'sequence':
+                # Carga masiva sin secuencia: los IDs se asignan antes del executemany
+                self.CREATE_WITH_ID = db.statement(f'{name}.create_with_id', f"""
+                    INSERT INTO {table} ({select_list})
+                    VALUES ({', '.join([':id'] + [self._value_sql(column) for column in self.columns])})
+                """)
+                self.MAX_ID = db.statement(f'{name}.max_id',
+                                           f"SELECT NVL(MAX({pk}), 0) AS max_id FROM {table}", 1)
+            # Con secuencia, un ID que no existe se da de alta con NEXTVAL y no con el
+            # del cliente: insertarlo tal cual chocaría después con la secuencia (ORA-00001)
+            insert_id = f"{sequence}.NEXTVAL" if id_strategy == 'sequence' else f's.{pk}'
+            self.UPSERT = db.statement(f'{name}.upsert', f"""
+                MERGE INTO {table} t
+                USING (SELECT {', '.join([f':id AS {pk}'] + [f':{column} AS {column}' for column in self.writable])} FROM dual) s
+                ON (t.{pk} = s.{pk})
+                WHEN MATCHED THEN UPDATE SET {', '.join(f't.{column} = s.{column}' for column in self.writable)}
+                WHEN NOT MATCHED THEN INSERT ({select_list})
+                VALUES ({', '.join([insert_id] + [sql_literal(self.fixed[column]) if column in self.fixed else f's.{column}' for column in self.columns])})
+            """)
+
+    def __repr__(self):
+        return f"<Resource {self.name} ({self.table})>"
+
+    def _next_id_sql(self):
+        if self.id_strategy == 'sequence':
+            return f"{self.sequence}.NEXTVAL"
+        # Sin secuencia en el nodo: el siguiente ID se calcula en la misma sentencia
+        return f"(SELECT NVL(MAX({self.pk}), 0) + 1 FROM {self.table})"
+
+    def _kind(self, column):
+        """Tipo de una columna para RETURNING ('int' la PK, 'float' los numéricos, 'text' el resto)"""
+        if column == self.pk:
+            return 'int'
+        column_type = self.types.get(column, str)
+        if column_type is str:
+            return 'text'
+        return 'int' if column_type is int else 'float'
+
+    def _value_sql(self, column):
+        if column in self.fixed:
+            return sql_literal(self.fixed[column])
+        return f":{column}"
+
+    def _sort(self, criteria):
+        """Retorna (columna, descendente) del orden pedido o el de la PK por defecto"""
+        if criteria is None or criteria.sort is None:
+            return self.pk, self.descending
+        return criteria.sort, criteria.descending
+
+    def _select_sql(self, kind, fields, criteria):
+        """Arma el SELECT de kind
+
+        kind es 'get_all', 'get_by_id', 'get_many', 'page_first',
+        'page_after' o, ordenando por una columna que no es la PK,
+        'page_null_first'/'page_null_after' (tramo final de filas con la
+        columna en NULL, ver get_page).
+        """
+        conditions = []
+        if kind == 'get_by_id':
+            conditions.append(f"{self.pk} = :id")
+        elif kind == 'get_many':
+            conditions.append(f"{self.pk} IN (SELECT COLUMN_VALUE FROM TABLE(:ids))")
+        elif criteria is not None:
+            for param in sorted(criteria.filters):
+                column, operator = self.filters[param]
+                conditions.append(FILTER_OPERATORS[operator][1].format(column=column, param=param))
+        sort, descending = self._sort(criteria)
+        direction, beyond = (' DESC', '<') if descending else ('', '>')
+        if sort == self.pk:
+            order = f"{self.pk}{direction}"
+            if kind == 'page_after':
+                conditions.append(f"{self.pk} {beyond} :after")
+        elif kind.startswith('page_null'):
+            # Tramo de nulos: solo la PK ordena (índice (columna, pk) con columna IS NULL)
+            order = f"{self.pk}{direction}"
+            conditions.append(f"{sort} IS NULL")
+            if kind == 'page_null_after':
+                conditions.append(f"{self.pk} {beyond} :after")
+        else:
+            # Orden por otra columna: la PK desempata en el mismo sentido, así
+            # el índice (columna, pk) se recorre en un solo rango (hacia atrás
+            # si es descendente); los nulos se leen aparte al final
+            order = f"{sort}{direction}, {self.pk}{direction}"
+            if kind == 'page_first':
+                conditions.append(f"{sort} IS NOT NULL")
+            elif kind == 'page_after':
+                conditions.append(f"{sort} {beyond}= :after_sort"
+                                  f" AND ({sort} {beyond} :after_sort OR {self.pk} {beyond} :after)")
+            else:
+                # Listado completo: mismo orden que las páginas, nulos al final
+                order = f"{sort}{direction} NULLS LAST, {self.pk}{direction}"
+        sql = f"SELECT {', '.join(fields)} FROM {self.table}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if kind not in ('get_by_id', 'get_many'):
+            sql += f" ORDER BY {order}"
+        if kind.startswith('page'):
+            sql += " FETCH FIRST :limit ROWS ONLY"
+        return sql
+
+    def query(self, kind, criteria=None):
+        """Sentencia de lectura kind para la proyección, filtros y orden de criteria"""
+        fields = tuple(criteria.fields) if criteria is not None and criteria.fields else self.select_columns
+        by_key = kind in ('get_by_id', 'get_many')
+        filters = tuple(sorted(criteria.filters)) if criteria is not None and not by_key else ()
+        sort, descending = self._sort(criteria) if not by_key else (self.pk, self.descending)
+        dynamic = fields != self.select_columns or bool(filters) or (sort, descending) != (self.pk, self.descending)
+        if not dynamic and kind in self._statements:
+            return self._statements[kind]
+        name = f'{self.name}.{kind}'
+        if fields != self.select_columns:
+            name += f"[{','.join(fields)}]"
+        if filters:
+            name += f"{{{','.join(filters)}}}"
+        if (sort, descending) != (self.pk, self.descending):
+            name += f"({'-' if descending else ''}{sort})"
+        expected_rows = 1 if kind == 'get_by_id' else None
+        # Las variantes pedidas por el cliente viven en el LRU del registro
+        statement = db.statement(name, self._select_sql(kind, fields, criteria), expected_rows,
+                                 dynamic=dynamic)
+        if not dynamic:
+            self._statements[kind] = statement
+        return statement
+
+    def parse_fields(self, value, sort=None):
+        """Valida ?fields= para esta tabla; la PK (alias 'id') y la columna de orden se incluyen siempre"""
+        # La clave de las páginas ([valor de sort, pk]) se lee de cada fila
+        required = (self.pk,) if sort in (None, self.pk) else (self.pk, sort)
+        return parse_fields(value, self.select_columns, required=required, aliases={'id': self.pk})
+
+    def parse_criteria(self, args):
+        """Arma el Criteria de un listado a partir de los parámetros de la URL
+
+        Lee ?fields=, los filtros declarados (p. ej. ?precio_min=, ?nombre_prefix=)
+        y ?sort=columna o ?sort=-columna; ValueError si algo no es válido.
+        """
+        filters = {}
+        for param, (column, operator) in self.filters.items():
+            value = args.get(param)
+            if value is None or value == '':
+                continue
+            try:
+                filters[param] = (column, operator, filter_value(operator, value))
+            except ValueError:
+                raise ValueError(f"Valor inválido para {param}: {value}")
+        sort, descending = None, False
+        requested = args.get('sort', '').strip().lower()
+        if requested:
+            descending = requested.startswith('-')
+            sort = requested.lstrip('-+')
+            if sort == 'id':
+                sort = self.pk
+            if sort not in self.sortable:
+                raise ValueError(f"Orden no permitido: {sort} (disponibles: {', '.join(self.sortable)})")
+        return Criteria(self.parse_fields(args.get('fields'), sort), filters, sort, descending)
+
+    # ---------------- Textos de las respuestas ----------------
+
+    def _adjective(self, stem):
+        return stem + ('a' if self.feminine else 'o')
+
+    # ---------------- Acceso a datos ----------------
+
+    @property
+    def transform(self):
+        """Función de salida por fila (None si la tabla no transforma columnas)"""
+        return self.apply_transforms if self.transforms else None
+
+    def apply_transforms(self, row):
+        """Aplica en sitio las transformaciones de columna a una fila y la retorna"""
+        for column, function in self.transforms.items():
+            if column in row:
+                row[column] = function(row[column])
+        return row
+
+    def _output_rows(self, rows):
+        """Aplica las transformaciones a filas recién leídas (lo que se guarda en caché es la salida final)"""
+        if self.transforms:
+            for row in rows:
+                self.apply_transforms(row)
+        return rows
+
+    def _cached(self, key, loader, keep=bool):
+        """Lectura a través de la caché del recurso (directa si no hay caché o dentro de una transacción)"""
+        if self.cache is None or db.in_transaction():
+            # Dentro de db.transaction() se verían cambios aún no confirmados
+            return loader()
+        if key != ('version',):
+            # Los datos se guardan con la versión de la tabla: un ETag nunca
+            # acompaña datos de otra versión y, al vencer la versión guardada,
+            # los cambios hechos fuera de este proceso se ven en la próxima lectura
+            version = self.version()
+            if version is None:
+                return loader()
+            key = (version[0],) + key
+            return self.cache.get_or_load(self.name, key, loader, keep=keep)
+        return self.cache.get_or_load(self.name, key, loader, keep=keep, ttl=self.cache.version_ttl)
+
+    def get_all(self, stream=False, columnar=False, criteria=None):
+        """Obtiene todas las filas (por lotes si stream=True, por columnas si columnar=True)
+
+        Las filas completas ya vienen transformadas y pueden ser las de la
+        caché: no se deben modificar.
+        """
+        statement = self.query('get_all', criteria)
+        params = criteria.params() if criteria is not None else None
+        if stream:
+            return db.stream_query(statement, params)
+        if not columnar:
+            return self._cached(('get_all', statement.name, tuple(sorted((params or {}).items()))),
+                                lambda: self._output_rows(db.execute_query(statement, params)))
+        result = db.execute_query(statement, params, columnar=columnar)
+        if columnar:
+            for column, function in self.transforms.items():
+                result = result.map_column(column, function)
+        return result
+
+    def get_by_id(self, record_id, fields=None):
+        """Obtiene una fila por su PK ya transformada (None si no existe)"""
+        statement = self.query('get_by_id', Criteria(fields))
+        result = self._cached(('get_by_id', statement.name, record_id),
+                              lambda: self._output_rows(db.execute_query(statement, {'id': record_id})))
+        return result[0] if result else None
+
+    def get_many(self, ids, fields=None):
+        """Obtiene varias filas por PK en una sola consulta
+
+        Retorna ({id: fila ya transformada} en el orden de ids, lista de IDs
+        que no existen).
+        """
+        statement = self.query('get_many', Criteria(fields))
+
+        def load():
+            found, missing = fetch_many(statement, ids, self.pk.upper())
+            self._output_rows(found.values())
+            return found, missing
+
+        return self._cached(('get_many', statement.name, tuple(ids)), load,
+                            keep=lambda value: bool(value[0]))
+
+    def get_page(self, limit, after=None, criteria=None):
+        """Obtiene una página en el orden pedido (after = clave del cursor)
+
+        Con el orden por defecto la clave es [pk]; ordenando por otra columna
+        es [valor de la columna, pk]. Cada página es un rango del índice
+        (columna, pk) en el sentido pedido; las filas con la columna en NULL
+        forman un tramo aparte que se lee al agotar las demás (clave [None, pk]).
+        """
+        params = criteria.params() if criteria is not None else {}
+        sort, descending = self._sort(criteria)
+        pk_key = self.pk.upper()
+        if sort == self.pk:
+            key = lambda row: [row[pk_key]]
+        else:
+            sort_key = sort.upper()
+            key = lambda row: [row[sort_key], row[pk_key]]
+        if after is not None:
+            if len(after) != (1 if sort == self.pk else 2) or not isinstance(after[-1], (int, float)):
+                raise ValueError("Cursor inválido para este recurso y orden")
+            if not isinstance(after[0], (str, int, float, type(None))):
+                raise ValueError("Cursor inválido para este recurso y orden")
+            params['after'] = after[-1]
+        if sort == self.pk:
+            kind = 'page_first' if after is None else 'page_after'
+            return fetch_page(self.query(kind, criteria), params, limit, key)
+        if after is not None and after[0] is None:
+            return fetch_page(self.query('page_null_after', criteria), params, limit, key)
+
+        if after is None:
+            rows, next_key = fetch_page(self.query('page_first', criteria), params, limit, key)
+        else:
+            params['after_sort'] = after[0]
+            rows, next_key = fetch_page(self.query('page_after', criteria), params, limit, key)
+            params.pop('after_sort')
+        if next_key is not None:
+            return rows, next_key
+        # Sin más valores: la página sigue con el tramo de nulos
+        params.pop('after', None)
+        null_first = self.query('page_null_first', criteria)
+        if len(rows) < limit:
+            null_rows, next_key = fetch_page(null_first, params, limit - len(rows), key)
+            return rows + null_rows, next_key
+        # Página llena justo al final de los valores: basta saber si hay nulos
+        null_rows, _ = fetch_page(null_first, params, 1, key)
+        return rows, key(rows[-1]) if null_rows else None
+
+    def _version_row(self):
+        """Fila de la consulta VERSION (a través de la caché); None si no se pudo leer"""
+        if self.audit:
+            params = {'tabla': self.name}
+        elif self.mview:
+            params = {'mview': self.mview}
+        else:
+            params = None
+        result = self._cached(('version',), lambda: db.execute_query(self.VERSION, params))
+        return result[0] if result else None
+
+    def version(self):
+        """Versión actual de la tabla: (marca, fecha del último cambio o None)
+
+        Con auditoría la marca es el último id_auditoria de la tabla (o, si la
+        tabla aún no tiene registros, su ORA_ROWSCN); en una vista
+        materializada, la fecha de su último refresco; si no, el ORA_ROWSCN
+        más alto y la cantidad de filas. None si no se pudo leer (la
+        respuesta sale entonces sin validadores ni caché).
+        """
+        row = self._version_row()
+        if row is None:
+            return None
+        if self.audit and row['VERSION'] is not None:
+            return int(row['VERSION']), row['MODIFICADO']
+        if self.audit:
+            # 'scn.filas': no coincide nunca con un id_auditoria
+            return row['FILAS'], None
+        if self.mview:
+            refreshed = row['MODIFICADO']
+            return (refreshed.strftime('%Y%m%d%H%M%S'), refreshed) if refreshed is not None else None
+        return f"{row['VERSION'] or 0}.{row['FILAS']}", None
+
+    def watermark(self):
+        """Última marca de cambios de la tabla (id_auditoria más alto; 0 si no hay)"""
+        row = self._version_row()
+        return int(row['VERSION'] or 0) if row is not None else 0
+
+    def changes(self, since, limit=DEFAULT_PAGE_SIZE, fields=None):
+        """Filas altas/modificadas y IDs eliminados después de la marca since
+
+        Lee hasta limit registros de auditoría de la tabla, se queda con la
+        última operación de cada ID y trae el estado actual de las filas
+        vigentes con una sola consulta (get_many). Retorna (nueva marca,
+        filas, IDs eliminados, hay_más).
+        """
+        entries = db.execute_query(self.CHANGES, {'tabla': self.name, 'since': since, 'limit': limit + 1},
+                                   arraysize=limit + 1, prefetchrows=limit + 2)
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        if not entries:
+            return since, [], [], False
+        last = {}
+        for entry in entries:
+            record_id = audit_record_id(entry)
+            if record_id is not None:
+                # El orden de inserción del dict sigue el de la última operación
+                last.pop(record_id, None)
+                last[record_id] = entry['TIPO_OPERACION']
+        deleted = [record_id for record_id, operation in last.items() if operation == 'D']
+        upserted = [record_id for record_id, operation in last.items() if operation != 'D']
+        rows = []
+        # Sin caché: las filas deben corresponder a la marca que se devuelve
+        statement = self.query('get_many', Criteria(fields))
+        for start in range(0, len(upserted), MAX_PAGE_SIZE):
+            found, missing = fetch_many(statement, upserted[start:start + MAX_PAGE_SIZE], self.pk.upper())
+            rows.extend(found.values())
+            # Borradas después de la ventana leída: ya no existen
+            deleted.extend(missing)
+        return int(entries[-1]['ID_AUDITORIA']), rows, deleted, has_more
+
+    def values_from(self, data):
+        """Toma del cuerpo de la petición las columnas escribibles; ValueError si falta alguna"""
+        if not isinstance(data, dict):
+            raise ValueError("Se esperaba un objeto JSON")
+        values = {}
+        for column in self.writable:
+            if column in data:
+                values[column] = data[column]
+            elif column in self.optional:
+                values[column] = self.optional[column]
+            else:
+                raise ValueError(f"Falta el campo requerido: {column}")
+        return values
+
+    def create(self, **values):
+        """Inserta una fila; retorna la fila guardada con su ID (None si falla)"""
+        params = {column: values.get(column, self.optional.get(column)) for column in self.writable}
+        row = db.execute_returning(self.CREATE_RETURNING, params)
+        if row:
+            self._changed('create', row[self.pk.upper()])
+        return row
+
+    def update(self, record_id, **values):
+        """Actualiza una fila por su PK; retorna la fila guardada ({} si no existe, None si falla)"""
+        params = {column: values.get(column, self.optional.get(column)) for column in self.writable}
+        params['id'] = record_id
+        row = db.execute_returning(self.UPDATE, params)
+        if row:
+            self._changed('update', record_id)
+        return row
+
+    def delete(self, record_id):
+        """Elimina una fila por su PK; retorna las filas afectadas (None si falla)"""
+        result = db.execute_dml(self.DELETE, {'id': record_id})
+        if result:
+            self._changed('delete', record_id)
+        return result
+
+    def _bulk_rows(self, records, upsert):
+        """Valida las filas de una carga masiva: retorna ([(índice, params)], errores)"""
+        rows, errors = [], []
+        for index, data in enumerate(records):
+            try:
+                params = self.values_from(data)
+                if upsert:
+                    record_id = data.get('id', data.get(self.pk))
+                    if record_id is None:
+                        raise ValueError("Falta el campo requerido: id")
+                    params['id'] = int(record_id)
+            except (ValueError, TypeError) as e:
+                errors.append({'index': index, 'error': str(e)})
+                continue
+            rows.append((index, params))
+        return rows, errors
+
+    def create_many(self, records, upsert=False):
+        """Inserta (o con upsert=True, inserta/actualiza por PK) muchas filas
+
+        Se valida cada fila, las válidas se envían con executemany por lotes
+        en una sola transacción y los errores por fila (de validación o de
+        Oracle) se reportan sin abortar el resto. Retorna (filas afectadas,
+        [{'index': i, 'error': mensaje}]) o None si falla la ejecución.
+        """
+        rows, errors = self._bulk_rows(records, upsert)
+        if not rows:
+            return 0, errors
+        with db.acquire():
+            # Misma sesión para leer el último ID y para el executemany
+            if upsert:
+                statement = self.UPSERT
+            elif self.id_strategy == 'sequence':
+                statement = self.CREATE
+            else:
+                statement = self.CREATE_WITH_ID
+                result = db.execute_query(self.MAX_ID)
+                next_id = int(result[0]['MAX_ID']) if result else 0
+                for offset, (index, params) in enumerate(rows):
+                    params['id'] = next_id + offset + 1
+            result = db.execute_many(statement, [params for index, params in rows], BULK_BATCH_SIZE)
+        if result is None:
+            return None
+        affected, batch_errors = result
+        errors.extend({'index': rows[offset][0], 'error': message} for offset, message in batch_errors)
+        errors.sort(key=lambda error: error['index'])
+        if affected:
+            self._changed('bulk', None)
+        return affected, errors
+
+    def on_change(self, callback):
+        """Registra callback(recurso, operación, id) tras cada escritura confirmada (p. ej. cachés)"""
+        self._listeners.append(callback)
+        return callback
+
+    def _changed(self, operation, record_id):
+        if self._listeners:
+            # Dentro de db.transaction() se avisa recién después del commit
+            db.on_commit(lambda: self._notify(operation, record_id))
+
+    def _notify(self, operation, record_id):
+        for callback in self._listeners:
+            try:
+                callback(self, operation, record_id)
+            except Exception as e:
+                print(f"Error notificando cambio en {self.name}: {e}")
+
+    # ---------------- Rutas ----------------
+
+    def list_response(self):
+        """Respuesta del listado según los parámetros (página, columnas, streaming o completo)"""
+        try:
+            criteria = self.parse_criteria(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'data': [], 'error': str(e)}), 400
+        if 'ids' in request.args:
+            return self.many_response(request.args['ids'], criteria.fields)
+        if wants_page():
+            return paged_response(lambda limit, after: self.get_page(limit, after, criteria),
+                                  transform=self.transform)
+        if wants_columnar():
+            return columnar_response(self.get_all(columnar=True, criteria=criteria))
+        if wants_stream():
+            return stream_rows(self.get_all(stream=True, criteria=criteria), transform=self.transform)
+        rows = self.get_all(criteria=criteria)
+        return jsonify({'success': True, 'data': rows})
+
+    def many_response(self, value, fields=None):
+        """Respuesta de ?ids= de esta tabla (ver many_response)"""
+        return many_response(value, self.get_many, fields)
+
+    def changes_response(self):
+        """Respuesta de /changes: sin ?since= solo la marca actual (punto de partida)"""
+        try:
+            fields = self.parse_fields(request.args.get('fields'))
+            limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+            if not 1 <= limit <= MAX_PAGE_SIZE:
+                raise ValueError(f"limit debe estar entre 1 y {MAX_PAGE_SIZE}")
+            since = request.args.get('since')
+            if since not in (None, ''):
+                if not since.isdigit():
+                    raise ValueError(f"since debe ser un id_auditoria (entero): {since}")
+                since = int(since)
+            else:
+                since = None
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if since is None:
+            return jsonify({'success': True, 'watermark': self.watermark()})
+        watermark, rows, deleted, has_more = self.changes(since, limit, fields)
+        return jsonify({
+            'success': True,
+            'since': since,
+            'watermark': watermark,
+            'has_more': has_more,
+            'upserted': [self.apply_transforms(row) for row in rows],
+            'deleted': deleted
+        })
+
+    def read_only_response(self):
+        """Respuesta 403 para escrituras sobre una tabla de solo lectura"""
+        article = 'Las' if self.feminine else 'Los'
+        return jsonify({
+            'success': False,
+            'error': f'Operación no permitida: {article} {self.plural} son de solo lectura (vista materializada)',
+            'message': self.read_only_message or 'Esta entidad se gestiona desde el servidor maestro'
+        }), 403
+
+def register_routes(app, resource):
+    """Registra GET (listado e ítem), POST, PUT, DELETE, POST /bulk y GET /changes de un recurso en la app"""
+    base = f'/api/{resource.endpoint}'
+    item = f'{base}/<int:record_id>'
+
+    def validated(build):
+        if resource.cache is None:
+            # Sin caché el ETag sale del cuerpo: la versión costaría un viaje más por GET
+            return hashed_get(build)
+        # La versión se lee antes que los datos: ante una escritura intermedia
+        # el ETag queda viejo y el próximo GET condicional recibe la tabla completa
+        return conditional_get(resource.version(), build, resource.cache, resource.name)
+
+    def list_records():
+        try:
+            return validated(resource.list_response)
+        except Exception as e:
+            print(f"ERROR listando {resource.plural}: {str(e)}")
+            return jsonify({'success': False, 'data': [], 'error': str(e)}), 500
+
+    def get_record(record_id):
+        try:
+            fields = resource.parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        def item_response():
+            row = resource.get_by_id(record_id, fields)
+            if row:
+                return jsonify(row)
+            return jsonify({'error': f"{resource.label} {resource._adjective('no encontrad')}"}), 404
+
+        try:
+            return validated(item_response)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    def create_record():
+        if resource.read_only:
+            return resource.read_only_response()
+        try:
+            values = resource.values_from(request.json)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        try:
+            row = resource.create(**values)
+            if row:
+                return jsonify({'success': True,
+                                'message': f"{resource.label} {resource._adjective('cread')} exitosamente",
+                                'data': resource.apply_transforms(row)})
+            return jsonify({'success': False, 'error': f'Error al crear {resource.label.lower()}'}), 500
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    def update_record(record_id):
+        if resource.read_only:
+            return resource.read_only_response()
+        try:
+            values = resource.values_from(request.json)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        try:
+            row = resource.update(record_id, **values)
+            if row:
+                return jsonify({'success': True,
+                                'message': f"{resource.label} {resource._adjective('actualizad')} exitosamente",
+                                'data': resource.apply_transforms(row)})
+            if row is not None:
+                return jsonify({'success': False,
+                                'error': f"{resource.label} {resource._adjective('no encontrad')}"}), 404
+            return jsonify({'success': False, 'error': f'Error al actualizar {resource.label.lower()}'}), 500
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    def delete_record(record_id):
+        if resource.read_only:
+            return resource.read_only_response()
+        try:
+            if resource.delete(record_id):
+                return jsonify({'success': True,
+                                'message': f"{resource.label} {resource._adjective('eliminad')} exitosamente"})
+            return jsonify({'success': False, 'error': f'Error al eliminar {resource.label.lower()}'}), 500
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    def bulk_records():
+        if resource.read_only:
+            return resource.read_only_response()
+        records = request.get_json(silent=True)
+        if not isinstance(records, list) or not records:
+            return jsonify({'success': False, 'error': 'Se esperaba un arreglo JSON con al menos una fila'}), 400
+        if len(records) > BULK_MAX_ROWS:
+            return jsonify({'success': False, 'error': f'Se pueden cargar hasta {BULK_MAX_ROWS} filas por petición'}), 400
+        mode = request.args.get('mode', 'insert').lower()
+        if mode not in ('insert', 'upsert'):
+            return jsonify({'success': False, 'error': f'Modo no válido: {mode} (insert o upsert)'}), 400
+        try:
+            result = resource.create_many(records, upsert=(mode == 'upsert'))
+            if result is None:
+                return jsonify({'success': False, 'error': f'Error en la carga masiva de {resource.plural}'}), 500
+            affected, errors = result
+            return jsonify({
+                'success': not errors,
+                'mode': mode,
+                'received': len(records),
+                'affected': affected,
+                'errors': errors
+            }), 200 if affected or not errors else 400
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    def list_changes():
+        try:
+            return resource.changes_response()
+        except Exception as e:
+            print(f"ERROR leyendo cambios de {resource.plural}: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    app.add_url_rule(base, f'list_{resource.name}', list_records, methods=['GET'])
+    app.add_url_rule(item, f'get_{resource.name}', get_record, methods=['GET'])
+    app.add_url_rule(base, f'create_{resource.name}', create_record, methods=['POST'])
+    app.add_url_rule(item, f'update_{resource.name}', update_record, methods=['PUT'])
+    app.add_url_rule(item, f'delete_{resource.name}', delete_record, methods=['DELETE'])
+    app.add_url_rule(f'{base}/bulk', f'bulk_{resource.name}', bulk_records, methods=['POST'])
+    if resource.audit:
+        app.add_url_rule(f'{base}/changes', f'changes_{resource.name}', list_changes, methods=['GET'])
@@ -0,0 +1,258 @@
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+from flask import Response, current_app, jsonify, make_response, request
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Tamaño de página por defecto y máximo para ?limit=
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Codificaciones que compress_response agrega como sufijo del ETag
+ETAG_ENCODINGS = ('br', 'gzip')
+
+def wants_stream():
+    """Indica si el cliente pidió la respuesta en streaming
+
+    Se activa con ?stream=1 (o stream=json / stream=ndjson) o enviando
+    'Accept: application/x-ndjson'.
+    """
+    stream = request.args.get('stream', '').lower()
+    if stream in ('1', 'true', 'json', 'ndjson'):
+        return True
+    return wants_ndjson()
+
+def wants_ndjson():
+    """Indica si el streaming debe ser NDJSON (una fila JSON por línea)"""
+    stream = request.args.get('stream', '').lower()
+    if stream == 'ndjson':
+        return True
+    if stream in ('1', 'true', 'json'):
+        return False
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+def peek_batches(batches):
+    """Lee el primer lote antes de responder; retorna (primer lote o None, todos los lotes)
+
+    Así los errores de Oracle llegan a la ruta (y a su código de estado) en
+    lugar de cortar el cuerpo a medias.
+    """
+    batches = iter(batches)
+    first = next(batches, None)
+
+    def all_batches():
+        if first is not None:
+            yield first
+        yield from batches
+
+    return first, all_batches()
+
+def stream_rows(batches, envelope=True, transform=None):
+    """Respuesta en streaming a partir de lotes de filas (ver db.stream_query)
+
+    En modo JSON se escribe el mismo cuerpo que jsonify ({"data": [...],
+    "success": true}, o la lista sola si envelope=False) pero lote a lote;
+    en modo NDJSON se escribe una fila por línea. transform se aplica a
+    cada fila antes de serializarla.
+    """
+    _, batches = peek_batches(batches)
+    dumps = current_app.json.dumps
+    # Los generadores corren después de la petición: el logger se toma ahora
+    logger = current_app.logger
+    ndjson = wants_ndjson()
+
+    def encode(batch):
+        if transform is not None:
+            batch = [transform(row) for row in batch]
+        return [dumps(row) for row in batch]
+
+    def generate_ndjson():
+        try:
+            for batch in batches:
+                yield ''.join(line + '\n' for line in encode(batch))
+        except Exception as e:
+            logger.error("Error en streaming: %s", e)
+            yield dumps({'success': False, 'error': str(e)}) + '\n'
+
+    def generate_json():
+        yield '{"data": [' if envelope else '['
+        separator = ''
+        try:
+            for batch in batches:
+                lines = encode(batch)
+                if lines:
+                    yield separator + ','.join(lines)
+                    separator = ','
+        except Exception as e:
+            logger.error("Error en streaming: %s", e)
+            if envelope:
+                yield '], "error": ' + dumps(str(e)) + ', "success": false}'
+            return
+        yield '], "success": true}' if envelope else ']'
+
+    if ndjson:
+        return Response(generate_ndjson(), mimetype=NDJSON_MIMETYPE)
+    return Response(generate_json(), mimetype='application/json')
+
+def wants_columnar():
+    """Indica si el cliente pidió el formato por columnas (?shape=columnar)"""
+    return request.args.get('shape', '').lower() == 'columnar'
+
+def columnar_response(result):
+    """Respuesta {"columns": [...], "rows": [[...], ...]} de un ColumnarResult
+
+    Las filas se serializan como arreglos, sin armar un diccionario por fila.
+    """
+    body = result.to_dict()
+    body['success'] = True
+    return jsonify(body)
+
+def wants_page():
+    """Indica si el cliente pidió paginación por clave (?limit= y/o ?after=)"""
+    return 'limit' in request.args or 'after' in request.args
+
+def _cursor_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Valor no serializable en cursor: {value!r}")
+
+def encode_cursor(key):
+    """Codifica la clave de la última fila como cursor opaco para ?after="""
+    raw = json.dumps(list(key), default=_cursor_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token):
+    """Decodifica un cursor de encode_cursor; ValueError si no es válido"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        key = json.loads(raw.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Cursor inválido: {token}") from e
+    if not isinstance(key, list) or not key:
+        raise ValueError(f"Cursor inválido: {token}")
+    return key
+
+def paged_response(fetch_page, transform=None):
+    """Respuesta de una página por clave: {"data": [...], "next": cursor|null}
+
+    fetch_page(limit, after) retorna (filas, clave de la última fila o None
+    si no hay más páginas); after es la clave decodificada del cursor y
+    fetch_page lanza ValueError si no corresponde al recurso.
+    """
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit fuera de rango: {limit}")
+        after = request.args.get('after')
+        after = decode_cursor(after) if after else None
+        rows, next_key = fetch_page(limit, after)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Paginación inválida ({e}): limit entre 1 y {MAX_PAGE_SIZE}, after = valor de "next"'
+        }), 400
+
+    if transform is not None:
+        rows = [transform(row) for row in rows]
+    return jsonify({
+        'success': True,
+        'data': rows,
+        'next': encode_cursor(next_key) if next_key is not None else None
+    })
+
+def entity_tag(marker):
+    """ETag fuerte de la representación pedida: versión de la tabla, URL y formato (Accept)"""
+    raw = '|'.join((str(marker), request.full_path, request.headers.get('Accept', '')))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
+
+def matching_etag(tag, last_modified=None):
+    """ETag que el cliente ya tiene de esta versión (o True por If-Modified-Since); None si no
+
+    If-None-Match tiene prioridad; se aceptan también las variantes
+    comprimidas (tag-br, tag-gzip) que envió compress_response.
+    """
+    if request.if_none_match:
+        for candidate in (tag,) + tuple(f'{tag}-{encoding}' for encoding in ETAG_ENCODINGS):
+            if request.if_none_match.contains(candidate):
+                return candidate
+        return None
+    if last_modified is not None and request.if_modified_since is not None:
+        if last_modified.replace(microsecond=0) <= request.if_modified_since:
+            return True
+    return None
+
+def cached_build(build, cache, space, tag):
+    """Arma la respuesta con build() o la toma ya serializada de la caché (clave: el ETag)
+
+    Solo se guardan las respuestas 200 completas (no las de streaming); el
+    ETag ya incluye la versión de la tabla, la URL y Accept.
+    """
+    built = []
+
+    def load():
+        response = make_response(build())
+        built.append(response)
+        if response.status_code != 200 or response.is_streamed:
+            return None
+        return response.mimetype, response.get_data()
+
+    cached = cache.get_or_load(space, ('response', tag), load, keep=lambda value: value is not None)
+    if built:
+        return built[0]
+    mimetype, body = cached
+    return current_app.response_class(body, mimetype=mimetype)
+
+def conditional_get(version, build, cache=None, space=None):
+    """Respuesta de un GET con ETag/Last-Modified; 304 sin armar el cuerpo si no cambió
+
+    version es (marca de la tabla, fecha del último cambio o None), leída
+    antes que los datos; build() arma la respuesta completa. Con cache, el
+    cuerpo serializado se guarda en el espacio space por ETag. Sin versión
+    (None) se responde sin validadores.
+    """
+    if version is None:
+        return build()
+    marker, last_modified = version
+    if last_modified is not None:
+        # Fechas de Oracle sin zona: hora local del servidor
+        last_modified = last_modified.astimezone()
+    tag = entity_tag(marker)
+    matched = matching_etag(tag, last_modified)
+    if matched is not None:
+        response = Response(status=304)
+        response.set_etag(matched if matched is not True else tag)
+    else:
+        response = cached_build(build, cache, space, tag) if cache is not None else make_response(build())
+        if response.status_code != 200:
+            return response
+        response.set_etag(tag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Los navegadores revalidan siempre: el 304 cuesta una consulta de la versión
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    return response
+
+def hashed_get(build):
+    """Respuesta de un GET con ETag calculado sobre el cuerpo (recursos sin caché)
+
+    No lee la versión de la tabla: la consulta se ejecuta siempre y el 304
+    ahorra solo el envío del cuerpo, pero un GET sin validadores no paga un
+    viaje más a Oracle. El streaming sale sin validadores.
+    """
+    response = make_response(build())
+    if response.status_code != 200 or response.is_streamed:
+        return response
+    tag = hashlib.sha1(response.get_data()).hexdigest()[:24]
+    matched = matching_etag(tag)
+    if matched is not None:
+        response = Response(status=304)
+        response.set_etag(matched)
+    else:
+        response.set_etag(tag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    return response
@@ -0,0 +1,67 @@
+from flask import jsonify, request
+from .database import DatabaseUnavailableError
+
+# Rutas que deben responder aunque el circuito de Oracle esté abierto
+DB_STATUS_PATHS = ('/api/health', '/api/db/stats', '/api/db/breaker')
+
+def service_unavailable(db, retry_after):
+    """Respuesta 503 con Retry-After cuando Oracle no está disponible"""
+    response = jsonify({
+        'success': False,
+        'error': 'Base de datos no disponible temporalmente',
+        'breaker': db.breaker.get_state()
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def init_database_routes(app, db, cache=None):
+    """Registra el circuito de Oracle (503 con Retry-After) y GET /api/db/stats, /api/db/breaker y /api/health
+
+    cache es la caché de resultados del nodo cuyos contadores se muestran en /api/db/stats.
+    """
+
+    @app.before_request
+    def check_circuit_breaker():
+        """Rechaza de inmediato las peticiones a la API mientras el circuito está abierto"""
+        db.pop_unavailable_error()
+        if request.path.startswith('/api/') and request.path not in DB_STATUS_PATHS:
+            if db.breaker.is_open():
+                return service_unavailable(db, db.breaker.retry_after())
+
+    @app.after_request
+    def report_database_unavailable(response):
+        """Convierte en 503 los errores de una petición que encontró Oracle caído"""
+        error = db.pop_unavailable_error()
+        if error is not None and response.status_code >= 500:
+            return service_unavailable(db, error.retry_after)
+        return response
+
+    @app.errorhandler(DatabaseUnavailableError)
+    def handle_database_unavailable(error):
+        """Responde 503 a las caídas de Oracle no capturadas por la ruta"""
+        return service_unavailable(db, error.retry_after)
+
+    @app.route('/api/db/stats', methods=['GET'])
+    def get_db_stats():
+        """Obtiene estadísticas del pool de sesiones Oracle"""
+        return jsonify({
+            'success': True,
+            'pool': db.get_pool_stats(),
+            'health': db.get_health(),
+            'statements': db.get_statement_stats(),
+            'writes': db.get_write_stats(),
+            'cache': cache.get_stats() if cache is not None else None
+        })
+
+    @app.route('/api/db/breaker', methods=['GET'])
+    def get_db_breaker():
+        """Obtiene el estado del circuito de acceso a Oracle"""
+        return jsonify({'success': True, 'breaker': db.breaker.get_state()})
+
+    @app.route('/api/health', methods=['GET'])
+    def get_health():
+        """Obtiene el último estado de salud conocido de la base de datos"""
+        health = db.get_health()
+        status_code = 503 if health['status'] == 'down' else 200
+        return jsonify({'success': status_code == 200, 'health': health}), status_code
@@ -0,0 +1,30 @@
+"""
+Configuración común de las pruebas
+
+Las pruebas no necesitan Oracle: cx_Oracle se reemplaza por
+fake_cx_oracle antes de importar dataretail_comun, y la raíz del
+repositorio se agrega a sys.path como hace el database.py de cada nodo.
+"""
+
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, TESTS_DIR)
+
+import fake_cx_oracle
+
+sys.modules['cx_Oracle'] = fake_cx_oracle
+
+from dataretail_comun.database import OracleDatabase
+
+
+@pytest.fixture
+def database():
+    """OracleDatabase nueva sobre el pool simulado (sin hilo supervisor)"""
+    database = OracleDatabase('localhost', '1521', 'orcl', 'prueba', 'prueba')
+    database.pool = database._create_pool()
+    return database
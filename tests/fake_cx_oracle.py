@@ -0,0 +1,191 @@
+"""
+cx_Oracle simulado para las pruebas
+
+Implementa solo lo que usa dataretail_comun: la jerarquía de errores (con
+el código ORA en error.args[0].code, como el driver real), las constantes
+de tipos y del pool, y Connection/Cursor/SessionPool en memoria. Los
+cursores responden con las filas que devuelve Connection.responder(sql,
+params) y anotan cada sentencia en Connection.log.
+"""
+
+SPOOL_ATTRVAL_WAIT = 0
+SPOOL_ATTRVAL_TIMEDWAIT = 1
+
+DB_TYPE_NUMBER = 'NUMBER'
+DB_TYPE_BINARY_DOUBLE = 'BINARY_DOUBLE'
+DB_TYPE_VARCHAR = 'VARCHAR'
+DB_TYPE_CHAR = 'CHAR'
+DB_TYPE_DATE = 'DATE'
+DB_TYPE_TIMESTAMP = 'TIMESTAMP'
+DB_TYPE_TIMESTAMP_TZ = 'TIMESTAMP_TZ'
+DB_TYPE_TIMESTAMP_LTZ = 'TIMESTAMP_LTZ'
+NUMBER = DB_TYPE_NUMBER
+STRING = DB_TYPE_VARCHAR
+
+
+class _ErrorDetail:
+    def __init__(self, code, message):
+        self.code = code
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+class Error(Exception):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class InterfaceError(Error):
+    pass
+
+
+class IntegrityError(DatabaseError):
+    pass
+
+
+def oracle_error(code, message=None, error_class=DatabaseError):
+    """Crea un error como los del driver: ORA-<code> en args[0]"""
+    return error_class(_ErrorDetail(code, message or f"ORA-{code:05d}: error simulado"))
+
+
+def makedsn(host=None, port=None, service_name=None):
+    return f"{host}:{port}/{service_name}"
+
+
+class Var:
+    def __init__(self, value=None):
+        self.value = value
+
+    def getvalue(self, position=0):
+        return self.value
+
+
+class ObjectType:
+    def newobject(self, values=None):
+        return list(values or [])
+
+
+class Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self.rowcount = 0
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.outputtypehandler = None
+        self.prepared = None
+        self._rows = []
+
+    def prepare(self, sql):
+        self.prepared = sql
+
+    def parse(self, sql):
+        self.connection.log.append(('PARSE', sql))
+
+    def execute(self, sql, params=None):
+        connection = self.connection
+        connection.log.append((sql, params))
+        columns, rows = connection.responder(sql, params)
+        self.description = [(column, DB_TYPE_VARCHAR, None, None, None, None, True) for column in columns]
+        self._rows = list(rows)
+        self.rowcount = len(self._rows) if sql.lstrip().upper().startswith('SELECT') else 1
+        return self
+
+    def executemany(self, sql, rows, batcherrors=False, arraydmlrowcounts=False):
+        self.connection.log.append((sql, list(rows)))
+        self.rowcount = len(rows)
+
+    def getbatcherrors(self):
+        return []
+
+    def getarraydmlrowcounts(self):
+        return [1] * self.rowcount
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def var(self, kind, size=0, arraysize=1, outconverter=None):
+        return Var()
+
+    def setinputsizes(self, *args, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+
+class Connection:
+    handle = None
+
+    def __init__(self, *args, **kwargs):
+        self.call_timeout = 0
+        self.module = None
+        self.log = []
+        self.responder = lambda sql, params: (['ID'], [])
+
+    def cursor(self):
+        return Cursor(self)
+
+    def ping(self):
+        pass
+
+    def commit(self):
+        self.log.append(('COMMIT', None))
+
+    def rollback(self):
+        self.log.append(('ROLLBACK', None))
+
+    def gettype(self, name):
+        return ObjectType()
+
+    def close(self):
+        pass
+
+
+class SessionPool:
+    def __init__(self, user=None, password=None, dsn=None, min=1, max=2, increment=1,
+                 connectiontype=Connection, session_callback=None, **kwargs):
+        self.min = min
+        self.max = max
+        self.connectiontype = connectiontype
+        self.session_callback = session_callback
+        self.stmtcachesize = 20
+        self.opened = 0
+        self.busy = 0
+        self._idle = []
+
+    def acquire(self):
+        if self._idle:
+            connection = self._idle.pop()
+        else:
+            if self.opened >= self.max:
+                raise oracle_error(24457, "ORA-24457: OCISessionGet() could not find a free session")
+            connection = self.connectiontype()
+            connection.handle = self.opened
+            self.opened += 1
+            if self.session_callback is not None:
+                self.session_callback(connection, None)
+        self.busy += 1
+        return connection
+
+    def release(self, connection):
+        self.busy -= 1
+        self._idle.append(connection)
+
+    def drop(self, connection):
+        self.busy -= 1
+        self.opened -= 1
+
+    def close(self, force=False):
+        pass
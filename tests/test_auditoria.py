@@ -0,0 +1,70 @@
+"""Auditoría del maestro: ETag por el último id_auditoria y 503 cuando Oracle no está"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+from dataretail_comun.database import DatabaseUnavailableError, db
+
+MASTER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'DataRetailFinalVersion')
+
+
+@pytest.fixture(scope='module')
+def master_app():
+    sys.path.insert(0, MASTER_DIR)
+    try:
+        import app
+    finally:
+        sys.path.remove(MASTER_DIR)
+    return app.app
+
+
+@pytest.fixture
+def audit_rows(monkeypatch):
+    rows = [{'ID_AUDITORIA': 1, 'FECHA': datetime(2026, 10, 18, 9, 0), 'NOMBRE_TABLE': 'producto'}]
+    queries = []
+
+    def execute_query(query, params=None, **kwargs):
+        kind = query.name.split('.', 1)[1]
+        queries.append(kind)
+        if kind == 'version':
+            return [{'VERSION': rows[-1]['ID_AUDITORIA'], 'MODIFICADO': rows[-1]['FECHA']}]
+        return list(reversed(rows))
+
+    monkeypatch.setattr(db, 'execute_query', execute_query)
+    return rows, queries
+
+
+def test_audit_list_answers_304_until_a_new_audit_row(master_app, audit_rows):
+    rows, queries = audit_rows
+    client = master_app.test_client()
+
+    tag = client.get('/api/auditoria').headers['ETag']
+    del queries[:]
+    assert client.get('/api/auditoria', headers={'If-None-Match': tag}).status_code == 304
+    assert queries == ['version']
+
+    rows.append({'ID_AUDITORIA': 2, 'FECHA': datetime(2026, 10, 18, 9, 5), 'NOMBRE_TABLE': 'tarjeta'})
+    response = client.get('/api/auditoria', headers={'If-None-Match': tag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != tag
+    assert [row['ID_AUDITORIA'] for row in response.get_json()] == [2, 1]
+
+
+def test_audit_item_has_an_etag(master_app, audit_rows):
+    client = master_app.test_client()
+    response = client.get('/api/auditoria/1')
+    assert response.status_code == 200
+    assert client.get('/api/auditoria/1', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_audit_list_reports_oracle_down_as_503(master_app, monkeypatch):
+    def down(query, params=None, **kwargs):
+        raise DatabaseUnavailableError("Oracle caído", retry_after=5)
+
+    monkeypatch.setattr(db, 'execute_query', down)
+    response = master_app.test_client().get('/api/auditoria')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
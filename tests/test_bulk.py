@@ -0,0 +1,61 @@
+"""Carga masiva: el MERGE de las tablas con secuencia no inserta el ID del cliente"""
+
+import pytest
+
+from dataretail_comun.database import db
+from dataretail_comun.resources import Resource
+
+CATEGORIA = Resource(
+    'categoria_carga', 'categoria', 'id_categoria', ('nombre',),
+    endpoint='categorias_carga', label='Categoría', plural='categorías', feminine=True,
+    sequence='categoria_seq'
+)
+
+CLIENTE = Resource(
+    'cliente_carga', 'cliente', 'id_cliente', ('nombre', 'direccion'),
+    endpoint='clientes_carga', label='Cliente', plural='clientes',
+    fixed={'direccion': 'Carapungo'}, id_strategy='max'
+)
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Pool simulado en la instancia global db; retorna las sesiones abiertas"""
+    opened = []
+    monkeypatch.setattr(db, 'pool', db._create_pool())
+    callback = db.pool.session_callback
+
+    def track(connection, tag):
+        opened.append(connection)
+        if callback is not None:
+            callback(connection, tag)
+
+    db.pool.session_callback = track
+    return opened
+
+
+def merge_sql(resource):
+    return ' '.join(resource.UPSERT.sql.split())
+
+
+def test_sequence_merge_inserts_with_nextval():
+    sql = merge_sql(CATEGORIA)
+    assert "WHEN NOT MATCHED THEN INSERT (id_categoria, nombre) VALUES (categoria_seq.NEXTVAL, s.nombre)" in sql
+    assert "s.id_categoria, s.nombre" not in sql
+
+
+def test_max_merge_keeps_the_given_id():
+    sql = merge_sql(CLIENTE)
+    assert "VALUES (s.id_cliente, s.nombre, 'Carapungo')" in sql
+
+
+def test_bulk_upsert_sends_the_valid_rows_to_the_merge(sessions):
+    affected, errors = CATEGORIA.create_many(
+        [{'id': 7, 'nombre': 'Lácteos'}, {'nombre': 'Sin id'}, {'id': '12', 'nombre': 'Granos'}], upsert=True)
+
+    assert affected == 2
+    assert errors == [{'index': 1, 'error': "Falta el campo requerido: id"}]
+    connection, = sessions
+    (sql, rows), = [entry for entry in connection.log if isinstance(entry[1], list)]
+    assert sql == CATEGORIA.UPSERT.sql
+    assert rows == [{'nombre': 'Lácteos', 'id': 7}, {'nombre': 'Granos', 'id': 12}]
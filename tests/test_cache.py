@@ -0,0 +1,109 @@
+"""Caché de resultados: ventana de la versión y invalidación entre procesos"""
+
+from dataretail_comun import cache as cache_module
+from dataretail_comun.cache import RESULT_CACHE_VERSION_TTL, ResultCache, SharedCache
+from dataretail_comun.database import db
+from dataretail_comun.resources import Resource
+
+
+def test_version_ttl_defaults_to_a_short_window():
+    assert ResultCache('prueba').version_ttl == RESULT_CACHE_VERSION_TTL
+    assert ResultCache('prueba', ttl=60).version_ttl < 60
+    assert ResultCache('prueba', ttl=1, version_ttl=10).version_ttl == 1
+    assert ResultCache('prueba', version_ttl=10).version_ttl == 10
+
+
+def test_external_write_is_seen_after_the_version_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    audit = [41]
+    monkeypatch.setattr(db, 'execute_query',
+                        lambda query, params=None, **kwargs: [{'VERSION': audit[-1], 'MODIFICADO': None}])
+    resource = Resource(
+        'tarjeta_ventana', 'TARJETA', 'id_tarjeta', ('tipo', 'numero'),
+        endpoint='tarjetas_ventana', label='Tarjeta', plural='tarjetas', feminine=True,
+        sequence='tarjeta_seq', audit='auditoria_master', cache=ResultCache('prueba', ttl=60)
+    )
+
+    assert resource.version()[0] == 41
+    # Escritura de otro nodo: no pasa por on_change de este proceso
+    audit.append(42)
+    assert resource.version()[0] == 41
+    now[0] += RESULT_CACHE_VERSION_TTL + 0.1
+    assert resource.version()[0] == 42
+
+
+def test_shared_cache_invalidation_reaches_other_processes(tmp_path):
+    # Dos instancias sobre la misma carpeta, como dos procesos de trabajo
+    first = SharedCache('prueba', str(tmp_path), ttl=60)
+    second = SharedCache('prueba', str(tmp_path), ttl=60)
+    loads = []
+
+    def load():
+        loads.append(True)
+        return [{'VERSION': len(loads)}]
+
+    assert first.get_or_load('producto', ('version',), load, ttl=first.version_ttl) == [{'VERSION': 1}]
+    assert second.get_or_load('producto', ('version',), load, ttl=second.version_ttl) == [{'VERSION': 1}]
+    assert len(loads) == 1
+
+    first.invalidate('producto')
+    assert second.get_or_load('producto', ('version',), load, ttl=second.version_ttl) == [{'VERSION': 2}]
+
+
+def test_cache_stores_transformed_rows_only(monkeypatch):
+    calls = []
+
+    def censor(numero):
+        calls.append(numero)
+        return '****-' + numero[-4:]
+
+    monkeypatch.setattr(db, 'execute_query', lambda query, params=None, **kwargs: (
+        [{'VERSION': 7, 'MODIFICADO': None}] if query.name.endswith('.version')
+        else [{'ID_TARJETA': 1, 'TIPO': 'Visa', 'NUMERO': '4532-1234-5678-9012'}]))
+    cache = ResultCache('prueba', ttl=60)
+    resource = Resource(
+        'tarjeta_censura', 'TARJETA', 'id_tarjeta', ('tipo', 'numero'),
+        endpoint='tarjetas_censura', label='Tarjeta', plural='tarjetas', feminine=True,
+        sequence='tarjeta_seq', audit='auditoria_master', cache=cache, transforms={'numero': censor}
+    )
+
+    for _ in range(3):
+        assert resource.get_all()[0]['NUMERO'] == '****-9012'
+        assert resource.get_by_id(1)['NUMERO'] == '****-9012'
+        rows, missing = resource.get_many([1])
+        assert rows[1]['NUMERO'] == '****-9012'
+    # Una censura por consulta cargada; los aciertos no vuelven a censurar
+    assert len(calls) == 3
+    stored = [value for key, (expires, value) in cache._entries.items() if key[1] != ('version',)]
+    assert '4532-1234-5678-9012' not in repr(stored)
+
+
+def test_shared_cache_deletes_superseded_entries_on_invalidation(tmp_path):
+    shared = SharedCache('prueba', str(tmp_path), ttl=60)
+    shared.get_or_load('producto', ('get_all',), lambda: [{'ID': 1}])
+    shared.get_or_load('producto', ('get_by_id', 1), lambda: [{'ID': 1}])
+    shared.get_or_load('producto_x', ('get_all',), lambda: [{'ID': 2}])
+
+    shared.invalidate('producto')
+    entries = [path.name for path in tmp_path.iterdir() if path.name.endswith('.entry')]
+    assert len(entries) == 1 and entries[0].startswith('producto_x-')
+    assert shared._bytes == sum((tmp_path / name).stat().st_size for name in entries)
+
+
+def test_shared_cache_does_not_scan_on_every_store(tmp_path, monkeypatch):
+    shared = SharedCache('prueba', str(tmp_path), ttl=60, scan_seconds=3600)
+    scans = []
+    scan = shared._scan
+    monkeypatch.setattr(shared, '_scan', lambda: scans.append(True) or scan())
+
+    for key in range(20):
+        shared.get_or_load('producto', ('get_by_id', key), lambda: [{'ID': 1}])
+    assert scans == []
+
+    # Al pasar el límite se mide la carpeta y se desalojan las más viejas
+    shared.max_bytes = shared._bytes // 2
+    shared.get_or_load('producto', ('get_by_id', 99), lambda: [{'ID': 1}])
+    assert scans == [True]
+    assert shared._bytes <= shared.max_bytes
+    assert shared.get_stats()['evictions'] > 0
@@ -0,0 +1,134 @@
+"""GET condicionales: una escritura cambia el ETag y el ETag viejo recibe 200"""
+
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from dataretail_comun.cache import ResultCache
+from dataretail_comun.database import db
+from dataretail_comun.resources import Resource, register_routes
+
+
+class FakeTable:
+    """Tabla fabrica en memoria con su auditoría y un SCN que avanza con cada escritura"""
+
+    def __init__(self, triggers=True):
+        self.rows = {1: 'TechCorp S.A.', 2: 'Global Electronics'}
+        self.triggers = triggers
+        self.audit = []
+        self.scn = 100
+        self.queries = []
+
+    def write(self, record_id, nombre):
+        self.rows[record_id] = nombre
+        self.scn += 1
+        if self.triggers:
+            self.audit.append((len(self.audit) + 1, datetime(2026, 10, 18, 12, len(self.audit))))
+
+    def row(self, record_id):
+        return {'ID_FABRICA': record_id, 'NOMBRE': self.rows[record_id], 'PAIS': 'Ecuador'}
+
+    def execute_query(self, query, params=None, arraysize=None, prefetchrows=None, columnar=False):
+        kind = query.name.split('.', 1)[1]
+        self.queries.append(kind)
+        if kind == 'version':
+            if self.audit:
+                version, fecha = self.audit[-1]
+                return [{'VERSION': version, 'MODIFICADO': fecha, 'FILAS': None}]
+            return [{'VERSION': None, 'MODIFICADO': None, 'FILAS': f"{self.scn}.{len(self.rows)}"}]
+        if kind == 'get_by_id':
+            return [self.row(params['id'])] if params['id'] in self.rows else []
+        return [self.row(record_id) for record_id in sorted(self.rows)]
+
+    def execute_returning(self, query, params):
+        if params['id'] not in self.rows:
+            return {}
+        self.write(params['id'], params['nombre'])
+        return self.row(params['id'])
+
+
+def make_resource(name, cache):
+    return Resource(
+        name, 'FABRICA', 'id_fabrica', ('nombre', 'pais'),
+        endpoint=name, label='Fábrica', plural='fábricas', feminine=True,
+        sequence='fabrica_seq', audit='auditoria_master', cache=cache
+    )
+
+
+@pytest.fixture
+def fake_table(monkeypatch):
+    table = FakeTable()
+    monkeypatch.setattr(db, 'execute_query', table.execute_query)
+    monkeypatch.setattr(db, 'execute_returning', table.execute_returning)
+    return table
+
+
+def client_for(resource):
+    app = Flask(__name__)
+    register_routes(app, resource)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('triggers', [True, False])
+def test_write_changes_the_etag_of_a_cached_resource(fake_table, triggers):
+    fake_table.triggers = triggers
+    resource = make_resource(f'fabrica_etag_{triggers}'.lower(), ResultCache('prueba_etag'))
+    client = client_for(resource)
+    url = f'/api/{resource.endpoint}'
+
+    first = client.get(url)
+    tag = first.headers['ETag']
+    assert client.get(url, headers={'If-None-Match': tag}).status_code == 304
+    queries = len(fake_table.queries)
+    assert client.get(url, headers={'If-None-Match': tag}).status_code == 304
+    # Versión y datos salen de la caché: el 304 no consulta Oracle
+    assert len(fake_table.queries) == queries
+
+    updated = client.put(f'{url}/2', json={'nombre': 'Global Electronics Ltd.', 'pais': 'China'})
+    assert updated.status_code == 200
+
+    second = client.get(url, headers={'If-None-Match': tag})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != tag
+    assert second.get_json()['data'][1]['NOMBRE'] == 'Global Electronics Ltd.'
+    assert client.get(url, headers={'If-None-Match': second.headers['ETag']}).status_code == 304
+
+
+def test_write_from_another_process_is_seen_when_the_version_expires(fake_table):
+    resource = make_resource('fabrica_etag_externa', ResultCache('prueba_etag', version_ttl=0))
+    client = client_for(resource)
+    url = f'/api/{resource.endpoint}/1'
+
+    tag = client.get(url).headers['ETag']
+    # Escritura hecha por otro proceso: no pasa por on_change de este
+    fake_table.write(1, 'TechCorp Internacional')
+
+    response = client.get(url, headers={'If-None-Match': tag})
+    assert response.status_code == 200
+    assert response.get_json()['NOMBRE'] == 'TechCorp Internacional'
+
+
+def test_audit_version_falls_back_to_rowscn(fake_table):
+    fake_table.triggers = False
+    resource = make_resource('fabrica_etag_scn', None)
+
+    assert resource.version() == ('100.2', None)
+    assert resource.watermark() == 0
+    fake_table.write(1, 'TechCorp Internacional')
+    assert resource.version() == ('101.2', None)
+
+
+def test_uncached_resource_hashes_the_body_without_reading_the_version(fake_table):
+    resource = make_resource('fabrica_etag_sin_cache', None)
+    client = client_for(resource)
+    url = f'/api/{resource.endpoint}'
+
+    tag = client.get(url).headers['ETag']
+    assert client.get(url, headers={'If-None-Match': tag}).status_code == 304
+    assert 'version' not in fake_table.queries
+
+    client.put(f'{url}/1', json={'nombre': 'TechCorp Internacional', 'pais': 'Ecuador'})
+    response = client.get(url, headers={'If-None-Match': tag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != tag
@@ -0,0 +1,160 @@
+"""Supervisor de salud: ping de a una sesión, pool lleno y reconexión"""
+
+import pytest
+
+from fake_cx_oracle import oracle_error
+
+
+def open_sessions(pool, count):
+    """Deja count sesiones abiertas e inactivas en el pool"""
+    sessions = [pool.acquire() for _ in range(count)]
+    for session in sessions:
+        pool.release(session)
+    return sessions
+
+
+@pytest.fixture
+def reconnects(database, monkeypatch):
+    calls = []
+
+    def reconnect():
+        calls.append(True)
+        return True
+
+    monkeypatch.setattr(database, 'reconnect', reconnect)
+    return calls
+
+
+def test_check_holds_one_session_and_releases_it(database, reconnects):
+    pool = database.pool
+    open_sessions(pool, 3)
+    held = []
+    acquire = pool.acquire
+
+    def tracked_acquire():
+        connection = acquire()
+        held.append(pool.busy)
+        return connection
+
+    pool.acquire = tracked_acquire
+    database.breaker.record_failure()
+
+    assert database.supervisor.check()
+    assert held == [1]
+    assert pool.busy == 0
+    assert pool.opened == 3
+    assert database.supervisor.get_state()['status'] == 'up'
+    assert database.breaker.get_state()['failures'] == 0
+    assert not reconnects
+
+
+def test_dead_session_is_dropped_without_rebuilding(database, reconnects):
+    pool = database.pool
+    session, = open_sessions(pool, 1)
+
+    def killed():
+        raise oracle_error(28, "ORA-00028: your session has been killed")
+
+    session.ping = killed
+
+    assert database.supervisor.check()
+    state = database.supervisor.get_state()
+    assert state['status'] == 'degraded'
+    assert state['dead_sessions'] == 1
+    assert pool.busy == 0
+    assert pool.opened == 0
+    assert not reconnects
+
+
+def test_unexpected_ping_error_still_returns_the_session(database, reconnects):
+    pool = database.pool
+    session, = open_sessions(pool, 1)
+
+    def broken():
+        raise RuntimeError("fallo inesperado")
+
+    session.ping = broken
+
+    with pytest.raises(RuntimeError):
+        database.supervisor.check()
+    assert pool.busy == 0
+
+
+def test_saturated_pool_is_busy_without_acquiring(database, reconnects):
+    pool = database.pool
+    held = [pool.acquire() for _ in range(database.pool_max)]
+    pool.acquire = lambda: pytest.fail("el supervisor no debe esperar una sesión con el pool lleno")
+    database.breaker.record_failure()
+
+    assert database.supervisor.check()
+    state = database.supervisor.get_state()
+    assert state['status'] == 'busy'
+    assert state['consecutive_failures'] == 0
+    assert database.breaker.get_state()['failures'] == 1
+    assert pool.busy == len(held)
+    assert not reconnects
+
+
+def test_pool_wait_timeout_is_busy_not_down(database, reconnects):
+    def timeout():
+        raise oracle_error(24457, "ORA-24457: OCISessionGet() could not find a free session")
+
+    database.pool.acquire = timeout
+
+    assert database.supervisor.check()
+    assert database.supervisor.get_state()['status'] == 'busy'
+    assert not reconnects
+
+
+@pytest.mark.parametrize('code', [3113, 3114, 12541])
+def test_lost_connection_rebuilds_the_pool(database, reconnects, code):
+    pool = database.pool
+    session, = open_sessions(pool, 1)
+
+    def lost():
+        raise oracle_error(code)
+
+    session.ping = lost
+
+    assert database.supervisor.check()
+    state = database.supervisor.get_state()
+    assert reconnects == [True]
+    assert state['reconnects'] == 1
+    assert state['status'] == 'up'
+    assert pool.busy == 0
+
+
+def test_lost_connection_while_opening_a_session(database, reconnects):
+    def no_listener():
+        raise oracle_error(12541, "ORA-12541: TNS:no listener")
+
+    database.pool.acquire = no_listener
+
+    assert database.supervisor.check()
+    assert reconnects == [True]
+
+
+def test_failed_reconnect_is_down(database, monkeypatch):
+    monkeypatch.setattr(database, 'reconnect', lambda: False)
+    session, = open_sessions(database.pool, 1)
+
+    def lost():
+        raise oracle_error(3113)
+
+    session.ping = lost
+
+    assert not database.supervisor.check()
+    state = database.supervisor.get_state()
+    assert state['status'] == 'down'
+    assert state['consecutive_failures'] == 1
+
+
+def test_other_errors_do_not_rebuild_the_pool(database, reconnects):
+    def denied():
+        raise oracle_error(1017, "ORA-01017: invalid username/password; logon denied")
+
+    database.pool.acquire = denied
+
+    assert not database.supervisor.check()
+    assert database.supervisor.get_state()['status'] == 'down'
+    assert not reconnects
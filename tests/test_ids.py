@@ -0,0 +1,40 @@
+"""?ids=: varias filas por PK en una sola consulta, con los IDs faltantes aparte"""
+
+from flask import Flask, request
+
+from dataretail_comun.resources import many_response
+
+
+def make_client(rows):
+    calls = []
+
+    def get_many(ids, fields=None):
+        calls.append((ids, fields))
+        return {record_id: rows[record_id] for record_id in ids if record_id in rows}, \
+               [record_id for record_id in ids if record_id not in rows]
+
+    app = Flask(__name__)
+
+    @app.route('/api/auditoria')
+    def auditoria():
+        return many_response(request.args['ids'], get_many, ('id_auditoria',))
+
+    return app.test_client(), calls
+
+
+def test_ids_return_found_rows_and_missing_ids():
+    client, calls = make_client({3: {'ID_AUDITORIA': 3}, 1: {'ID_AUDITORIA': 1}})
+
+    body = client.get('/api/auditoria?ids=3,2,1,3').get_json()
+    assert body == {'success': True, 'data': {'3': {'ID_AUDITORIA': 3}, '1': {'ID_AUDITORIA': 1}},
+                    'missing': [2]}
+    assert calls == [([3, 2, 1], ('id_auditoria',))]
+
+
+def test_invalid_ids_are_rejected_without_querying():
+    client, calls = make_client({})
+
+    response = client.get('/api/auditoria?ids=1,x')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == "ID inválido: x"
+    assert calls == []
@@ -0,0 +1,40 @@
+"""Importación CSV por la API: los rechazos se descargan por identificador, sin exponer rutas"""
+
+import pytest
+from flask import Flask
+
+from dataretail_comun import importer
+from dataretail_comun.importer import register_import_routes
+from dataretail_comun.resources import Resource
+
+CATEGORIA = Resource(
+    'categoria_importacion', 'categoria', 'id_categoria', ('nombre',),
+    endpoint='categorias_importacion', label='Categoría', plural='categorías', feminine=True,
+    sequence='categoria_seq'
+)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, 'IMPORT_REJECTS_DIR', str(tmp_path))
+    app = Flask(__name__)
+    register_import_routes(app, [CATEGORIA])
+    return app.test_client()
+
+
+def test_rejects_are_downloaded_by_id(client, tmp_path):
+    response = client.post('/api/import/categorias_importacion', data='nombre\nLácteos,sobra\n',
+                           content_type='text/csv')
+    summary = response.get_json()
+    assert summary['rejected'] == 1
+    assert 'rejects_file' not in summary
+    assert str(tmp_path) not in response.get_data(as_text=True)
+
+    download = client.get(summary['rejects'])
+    assert download.status_code == 200
+    assert download.get_data(as_text=True).splitlines()[0] == '_linea,_error,nombre'
+
+
+@pytest.mark.parametrize('rejects_id', ['..%2F..%2Fetc%2Fpasswd', 'otro.rechazos', 'import_no_existe'])
+def test_unknown_or_unsafe_rejects_id_is_404(client, rejects_id):
+    assert client.get(f'/api/import/rejects/{rejects_id}').status_code == 404
@@ -0,0 +1,144 @@
+"""Paginación por clave: las sentencias generadas se ejecutan sobre SQLite en memoria"""
+
+import sqlite3
+
+import pytest
+
+from dataretail_comun.database import db
+from dataretail_comun.resources import Criteria, Resource
+from dataretail_comun.responses import decode_cursor
+
+ROWS = [
+    (1, 'cafe', 3.5), (2, 'azucar', None), (3, 'leche', 1.25), (4, 'pan', 3.5),
+    (5, 'sal', None), (6, 'te', 2.0), (7, 'arroz', 3.5), (8, 'miel', None),
+    (9, 'avena', 0.5), (10, 'queso', 7.0),
+]
+
+PRODUCTO = Resource(
+    'producto_paginas', 'producto', 'id_producto', ('nombre', 'precio'),
+    endpoint='productos_paginas', label='Producto', plural='productos',
+    sequence='producto_seq', sortable=('nombre', 'precio'),
+    filters={'precio': ('min',), 'nombre': ('prefix',)}
+)
+
+
+@pytest.fixture
+def sqlite_table(monkeypatch):
+    """Ejecuta las lecturas de db sobre una tabla producto en SQLite"""
+    connection = sqlite3.connect(':memory:')
+    connection.execute("CREATE TABLE producto (id_producto INTEGER PRIMARY KEY, nombre TEXT, precio REAL)")
+    connection.executemany("INSERT INTO producto VALUES (?, ?, ?)", ROWS)
+    executed = []
+
+    def execute_query(query, params=None, arraysize=None, prefetchrows=None, columnar=False):
+        executed.append(query)
+        sql = query.sql.replace('FETCH FIRST :limit ROWS ONLY', 'LIMIT :limit').replace('ORA_ROWSCN', 'rowid')
+        cursor = connection.execute(sql, params or {})
+        columns = [column[0].upper() for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    monkeypatch.setattr(db, 'execute_query', execute_query)
+    return executed
+
+
+def expected(sort, descending, filter_rows=lambda row: True):
+    rows = [row for row in ROWS if filter_rows(row)]
+    column = {'id_producto': 0, 'nombre': 1, 'precio': 2}[sort]
+    present = sorted((row for row in rows if row[column] is not None),
+                     key=lambda row: (row[column], row[0]), reverse=descending)
+    missing = sorted((row for row in rows if row[column] is None), key=lambda row: row[0], reverse=descending)
+    return [row[0] for row in present + missing]
+
+
+def walk(criteria, limit):
+    ids, pages, after = [], 0, None
+    while True:
+        rows, after = PRODUCTO.get_page(limit, after, criteria)
+        ids += [row['ID_PRODUCTO'] for row in rows]
+        pages += 1
+        assert pages <= len(ROWS) + 1
+        if after is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 7, 10, 20])
+@pytest.mark.parametrize('sort', ['id_producto', 'nombre', 'precio'])
+@pytest.mark.parametrize('descending', [False, True])
+def test_pages_cover_every_row_once_in_order(sqlite_table, sort, descending, limit):
+    ids, pages = walk(Criteria(sort=sort, descending=descending), limit)
+    assert ids == expected(sort, descending)
+    # Sin páginas vacías al final
+    assert pages == -(-len(ROWS) // limit)
+
+
+def test_pages_with_filters(sqlite_table):
+    criteria = Criteria(filters={'precio_min': ('precio', 'min', 2)}, sort='precio', descending=True)
+    ids, _ = walk(criteria, 2)
+    assert ids == expected('precio', True, lambda row: row[2] is not None and row[2] >= 2)
+
+
+def test_descending_tie_breaker_follows_the_sort(sqlite_table):
+    criteria = Criteria(sort='precio', descending=True)
+    first = PRODUCTO.query('page_first', criteria).sql
+    after = PRODUCTO.query('page_after', criteria).sql
+    assert first.endswith("WHERE precio IS NOT NULL ORDER BY precio DESC, id_producto DESC FETCH FIRST :limit ROWS ONLY")
+    assert "precio <= :after_sort AND (precio < :after_sort OR id_producto < :after)" in after
+    assert "IS NULL" not in after
+    assert "ORDER BY precio DESC, id_producto DESC" in after
+
+
+def test_null_segment_is_read_separately(sqlite_table):
+    criteria = Criteria(sort='precio')
+    rows, after = PRODUCTO.get_page(8, None, criteria)
+    assert [row['ID_PRODUCTO'] for row in rows] == [9, 3, 6, 1, 4, 7, 10, 2]
+    assert after == [None, 2]
+    assert [query.name for query in sqlite_table] == [
+        'producto_paginas.page_first(precio)', 'producto_paginas.page_null_first(precio)']
+
+    rows, after = PRODUCTO.get_page(8, after, criteria)
+    assert [row['ID_PRODUCTO'] for row in rows] == [5, 8]
+    assert after is None
+    assert sqlite_table[-1].sql.endswith(
+        "WHERE precio IS NULL AND id_producto > :after ORDER BY id_producto FETCH FIRST :limit ROWS ONLY")
+
+
+def test_invalid_cursor_is_rejected(sqlite_table):
+    with pytest.raises(ValueError):
+        PRODUCTO.get_page(2, ['x'], Criteria(sort='precio'))
+    with pytest.raises(ValueError):
+        PRODUCTO.get_page(2, [[1], 3], Criteria(sort='precio'))
+
+
+def test_next_cursor_in_the_list_endpoint(sqlite_table):
+    from flask import Flask
+    from dataretail_comun.resources import register_routes
+
+    app = Flask(__name__)
+    register_routes(app, PRODUCTO)
+    client = app.test_client()
+
+    seen = []
+    url = '/api/productos_paginas?limit=4&sort=-precio'
+    while url:
+        body = client.get(url).get_json()
+        seen += [row['ID_PRODUCTO'] for row in body['data']]
+        url = f"/api/productos_paginas?limit=4&sort=-precio&after={body['next']}" if body['next'] else None
+        if body['next']:
+            assert len(decode_cursor(body['next'])) == 2
+    assert seen == expected('precio', True)
+
+
+def test_projection_without_the_sort_column_still_pages(sqlite_table):
+    from flask import Flask
+    from dataretail_comun.resources import register_routes
+
+    app = Flask(__name__)
+    register_routes(app, PRODUCTO)
+    client = app.test_client()
+
+    response = client.get('/api/productos_paginas?sort=nombre&fields=precio&limit=3')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [sorted(row) for row in body['data']] == [['ID_PRODUCTO', 'NOMBRE', 'PRECIO']] * 3
+    assert [row['ID_PRODUCTO'] for row in body['data']] == [7, 9, 2]
+    assert decode_cursor(body['next']) == ['azucar', 2]
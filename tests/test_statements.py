@@ -0,0 +1,89 @@
+"""Registro de sentencias: warm-up de las estáticas, LRU de dinámicas y parses de v$sesstat"""
+
+from fake_cx_oracle import oracle_error
+
+
+def test_warm_up_parses_only_static_statements(database):
+    static = database.statement('producto.get_all', "SELECT id_producto FROM producto")
+    database.statement('producto.get_all[nombre]', "SELECT nombre FROM producto", dynamic=True)
+
+    with database.acquire() as connection:
+        parsed = [sql for kind, sql in connection.log if kind == 'PARSE']
+
+    assert parsed == [static.sql]
+    assert connection.module == 'dataretail'
+    assert database.get_statement_stats()['warmed_sessions'] == 1
+
+
+def test_dynamic_statements_are_capped(database):
+    database.statements.max_dynamic = 2
+    database.statement('producto.get_all', "SELECT id_producto FROM producto")
+    first = database.statement('producto.get_all[a]', "SELECT a FROM producto", dynamic=True)
+    database.statement('producto.get_all[b]', "SELECT b FROM producto", dynamic=True)
+    database.statement('producto.get_all[a]', "SELECT a FROM producto", dynamic=True)
+    database.statement('producto.get_all[c]', "SELECT c FROM producto", dynamic=True)
+
+    stats = database.statements.get_stats()
+    assert stats['dynamic'] == 2
+    assert stats['dynamic_evicted'] == 1
+    assert set(stats['by_statement']) == {'producto.get_all', 'producto.get_all[a]', 'producto.get_all[c]'}
+    assert len(database.statements) == 1
+
+    database.statement('producto.get_all[d]', "SELECT d FROM producto", dynamic=True)
+    # Una sentencia ya desalojada se puede seguir ejecutando sin contarse
+    database.execute_query(first)
+    assert 'producto.get_all[a]' not in database.statements.get_stats()['by_statement']
+
+
+def test_cursor_reuse_is_counted_within_one_checkout(database):
+    statement = database.statement('producto.get_by_id', "SELECT id_producto FROM producto WHERE id_producto = :id", 1)
+
+    with database.acquire():
+        database.execute_query(statement, {'id': 1})
+        database.execute_query(statement, {'id': 2})
+    database.execute_query(statement, {'id': 3})
+
+    stats = database.statements.get_stats()['by_statement']['producto.get_by_id']
+    assert stats['executions'] == 3
+    assert stats['cursor_reuses'] == 1
+
+
+def test_parse_stats_come_from_sesstat(database):
+    database.statement('producto.get_all', "SELECT id_producto FROM producto")
+    values = {'execute count': 100, 'parse count (total)': 10, 'parse count (hard)': 2,
+              'session cursor cache hits': 7}
+
+    def responder(sql, params):
+        assert 'v$sesstat' in sql and params == {'module': 'dataretail'}
+        return ['NAME', 'VALUE'], list(values.items())
+
+    connection = database.pool.acquire()
+    connection.responder = responder
+    database.pool.release(connection)
+
+    parses = database.get_statement_stats()['parses']
+    assert parses == {'executions': 100, 'hits': 90, 'misses': 10, 'hard_parses': 2,
+                      'session_cursor_cache_hits': 7, 'hit_ratio': 0.9}
+
+
+def test_parse_stats_without_access_to_sesstat(database):
+    def responder(sql, params):
+        raise oracle_error(942, "ORA-00942: table or view does not exist")
+
+    connection = database.pool.acquire()
+    connection.responder = responder
+    database.pool.release(connection)
+
+    assert database.get_parse_stats() is None
+
+
+def test_parse_stats_skip_oracle_unless_the_breaker_is_closed(database):
+    for _ in range(database.breaker.failure_threshold):
+        database.breaker.record_failure()
+    database.breaker._opened_at -= database.breaker.reset_timeout
+
+    assert database.get_parse_stats() is None
+    assert database.pool.opened == 0
+    # La prueba de half_open sigue libre para una petición real
+    assert database.breaker.get_state()['state'] == 'half_open'
+    assert database.breaker.allow_request()
@@ -0,0 +1,48 @@
+"""Rutas de estado de Oracle: circuito abierto, 503 con Retry-After y rutas exentas"""
+
+import pytest
+from flask import Flask, jsonify
+
+from dataretail_comun.cache import ResultCache
+from dataretail_comun.database import DatabaseUnavailableError
+from dataretail_comun.status import init_database_routes
+
+
+@pytest.fixture
+def client(database):
+    app = Flask(__name__)
+    init_database_routes(app, database, ResultCache('prueba'))
+
+    @app.route('/api/caida')
+    def caida():
+        raise DatabaseUnavailableError("Oracle caído", retry_after=7)
+
+    @app.route('/api/datos')
+    def datos():
+        return jsonify({'success': True})
+
+    return app.test_client()
+
+
+def test_open_circuit_rejects_api_requests_but_not_status_routes(database, client):
+    for _ in range(database.breaker.failure_threshold):
+        database.breaker.record_failure()
+
+    response = client.get('/api/datos')
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+    assert client.get('/api/db/breaker').get_json()['breaker']['state'] == 'open'
+    assert client.get('/api/db/stats').status_code == 200
+
+
+def test_unavailable_error_becomes_503(client):
+    response = client.get('/api/caida')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '7'
+    assert client.get('/api/datos').status_code == 200
+
+
+def test_stats_include_the_node_cache(client):
+    body = client.get('/api/db/stats').get_json()
+    assert body['cache']['name'] == 'prueba'
+    assert set(body) >= {'pool', 'health', 'statements', 'writes'}
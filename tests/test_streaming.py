@@ -0,0 +1,59 @@
+"""Streaming y exportación: el primer lote se lee antes de responder"""
+
+import pytest
+from flask import Flask
+
+from dataretail_comun.database import ColumnarResult, db
+from dataretail_comun.exporter import ExportQuery, export_response
+from dataretail_comun.responses import peek_batches, stream_rows
+
+EXPORT = ExportQuery(None, None, ['ID', 'NOMBRE'], ('ID',), {})
+
+
+def failing_batches():
+    raise RuntimeError("ORA-03113: end-of-file on communication channel")
+    yield
+
+
+def test_peek_batches_keeps_the_first_batch():
+    first, batches = peek_batches(iter([[1], [2]]))
+    assert first == [1]
+    assert list(batches) == [[1], [2]]
+    assert peek_batches(iter([]))[0] is None
+
+
+def test_first_batch_error_reaches_the_route():
+    app = Flask(__name__)
+    with app.test_request_context('/api/productos?stream=1'):
+        with pytest.raises(RuntimeError):
+            stream_rows(failing_batches())
+
+
+def test_export_reads_the_first_batch_before_answering(monkeypatch):
+    app = Flask(__name__)
+    monkeypatch.setattr(db, 'stream_query', lambda *args, **kwargs: failing_batches())
+    with app.test_request_context('/api/export/productos'):
+        with pytest.raises(RuntimeError):
+            export_response(EXPORT, 'productos', 'csv')
+
+    batch = ColumnarResult(['ID', 'NOMBRE'], [(1, 'Arroz'), (2, 'Azúcar')])
+    monkeypatch.setattr(db, 'stream_query', lambda *args, **kwargs: iter([batch]))
+    with app.test_request_context('/api/export/productos'):
+        response = export_response(EXPORT, 'productos', 'csv')
+        assert response.get_data(as_text=True).splitlines() == ['id,nombre', '1,Arroz', '2,Azúcar']
+
+
+def test_streaming_error_is_logged_after_the_request(caplog):
+    app = Flask(__name__)
+
+    def batches():
+        yield [{'ID': 1}]
+        raise RuntimeError("ORA-03113: end-of-file on communication channel")
+
+    with app.test_request_context('/api/productos?stream=ndjson'):
+        response = stream_rows(batches())
+    # El cuerpo se genera fuera del contexto de la petición
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == '{"ID": 1}'
+    assert '"success": false' in lines[1]
+    assert "ORA-03113" in caplog.text